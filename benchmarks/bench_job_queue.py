@@ -0,0 +1,184 @@
+# benchmarks/bench_job_queue.py
+"""
+Check the job queue guarantees on both backends, then time concurrent claims
+
+Usage:
+    python benchmarks/bench_job_queue.py [--jobs 500] [--threads 8]
+
+Every case runs against SQLiteJobQueue (in a temporary file) and
+RedisJobQueue on the in-memory FakeRedis: idempotent enqueue, exclusive
+claims, visibility timeout, release, max attempts and first completion wins.
+Any failure is listed and the script exits with status 1 before timing
+anything. The timing has ``--threads`` workers claim and complete
+``--jobs`` jobs at once and checks that no job was leased twice.
+"""
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fake_services import FakeRedis  # noqa: E402
+from utils.jobs import DONE, FAILED, RedisJobQueue, SQLiteJobQueue  # noqa: E402
+
+# Visibility timeout used by the cases, and how long they wait for a lease to run out
+LEASE = 0.2
+EXPIRE = 0.3
+
+
+def check_idempotent_enqueue(queue, failures):
+    first = queue.enqueue("run/a", {"name": "A"})
+    again = queue.enqueue("run/a", {"name": "A (again)"})
+    job = queue.claim("w1")
+    if not first or again:
+        failures.append(f"enqueue of a known key: returned {first}, then {again}")
+    if job is None or job.payload != {"name": "A"}:
+        failures.append(f"re-enqueued key replaced the payload: {job}")
+
+
+def check_exclusive_claims(queue, failures):
+    queue.enqueue("run/a", {"name": "A"})
+    queue.enqueue("run/b", {"name": "B"})
+    jobs = [queue.claim("w1"), queue.claim("w2"), queue.claim("w3")]
+    if None in jobs[:2] or jobs[0].key == jobs[1].key or jobs[2] is not None:
+        failures.append(f"two jobs claimed as {[job and job.key for job in jobs]}")
+    elif [job.key for job in jobs[:2]] != ["run/a", "run/b"]:
+        failures.append(f"jobs not claimed oldest first: {[job.key for job in jobs[:2]]}")
+
+
+def check_visibility_timeout(queue, failures):
+    queue.enqueue("run/a", {"name": "A"})
+    first = queue.claim("w1")
+    hidden = queue.claim("w2")
+    time.sleep(EXPIRE)
+    second = queue.claim("w2")
+    if hidden is not None:
+        failures.append("leased job claimed again before its visibility timeout")
+    if first is None or second is None or second.key != first.key or second.attempts != 2:
+        failures.append(f"expired lease not claimable again: {first} then {second}")
+
+
+def check_release(queue, failures):
+    queue.enqueue("run/a", {"name": "A"})
+    job = queue.claim("w1")
+    queue.release(job)
+    again = queue.claim("w2")
+    if again is None or again.key != "run/a" or again.attempts != 1:
+        failures.append(f"released job not claimable as the same attempt: {again}")
+
+
+def check_max_attempts(queue, failures):
+    queue.enqueue("run/a", {"name": "A"})
+    leases = []
+    for _ in range(queue.max_attempts + 1):
+        leases.append(queue.claim("w1"))
+        time.sleep(EXPIRE)
+    result = queue.results(["run/a"]).get("run/a", {})
+    if None in leases[:queue.max_attempts] or leases[-1] is not None:
+        failures.append(f"claimed {sum(lease is not None for lease in leases)} times with max_attempts {queue.max_attempts}")
+    if result.get("status") != FAILED or "error" not in result:
+        failures.append(f"job over max_attempts not failed: {result}")
+
+
+def check_first_completion_wins(queue, failures):
+    queue.enqueue("run/a", {"name": "A"})
+    slow = queue.claim("w1")
+    time.sleep(EXPIRE)
+    fast = queue.claim("w2")
+    won = queue.complete(fast, {"by": "w2"})
+    late = queue.complete(slow, {"by": "w1"})
+    result = queue.results(["run/a"]).get("run/a", {})
+    if not won or late or result != {"status": DONE, "by": "w2"}:
+        failures.append(f"completions returned {won}, {late}; stored {result}")
+    if queue.claim("w3") is not None:
+        failures.append("completed job claimed again")
+
+
+CASES = [check_idempotent_enqueue, check_exclusive_claims, check_visibility_timeout, check_release,
+         check_max_attempts, check_first_completion_wins]
+
+
+def backends(directory: str):
+    """Return (name, factory) pairs building an empty queue of each backend."""
+    counter = iter(range(1_000_000))
+    return [
+        ("sqlite", lambda **kwargs: SQLiteJobQueue(str(Path(directory) / f"jobs_{next(counter)}.db"), **kwargs)),
+        ("redis", lambda **kwargs: RedisJobQueue(FakeRedis(), **kwargs)),
+    ]
+
+
+def check_cases(directory: str):
+    """Return a description of every case a backend gets wrong."""
+    failures = []
+    for backend, make in backends(directory):
+        for case in CASES:
+            queue = make(visibility_timeout=LEASE, max_attempts=2)
+            problems = []
+            try:
+                case(queue, problems)
+            except Exception as e:
+                problems.append(f"{type(e).__name__}: {e}")
+            finally:
+                queue.close()
+            failures.extend(f"{backend} {case.__name__[len('check_'):]}: {problem}" for problem in problems)
+    return failures
+
+
+def time_claims(make, jobs: int, threads: int):
+    """Have ``threads`` workers drain ``jobs`` jobs; returns (seconds, jobs completed, jobs leased twice)."""
+    queue = make(visibility_timeout=60, max_attempts=3)
+    for i in range(jobs):
+        queue.enqueue(f"run/{i:05d}", {"name": f"Benchmark Org {i:04d}"})
+    leased, lock = [], threading.Lock()
+
+    def work(index: int):
+        while True:
+            job = queue.claim(f"w{index}")
+            if job is None:
+                return
+            with lock:
+                leased.append(job.key)
+            queue.complete(job, {"by": index})
+
+    start = time.perf_counter()
+    workers = [threading.Thread(target=work, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    seconds = time.perf_counter() - start
+    completed = len(queue.results(f"run/{i:05d}" for i in range(jobs)))
+    queue.close()
+    return seconds, completed, len(leased) - len(set(leased))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        failures = check_cases(directory)
+        if failures:
+            print("Queue cases failed:")
+            for failure in failures:
+                print(f"  {failure}")
+            sys.exit(1)
+        print(f"Queue cases: {len(CASES)} passed on sqlite and redis")
+
+        print(f"{'backend':>8} {'jobs':>8} {'threads':>8} {'done':>8} {'twice':>8} {'seconds':>8} {'jobs/s':>8}")
+        for backend, make in backends(directory):
+            seconds, completed, twice = time_claims(make, args.jobs, args.threads)
+            print(f"{backend:>8} {args.jobs:>8} {args.threads:>8} {completed:>8} {twice:>8} "
+                  f"{seconds:>8.2f} {args.jobs / seconds:>8.0f}")
+            if completed != args.jobs or twice:
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# benchmarks/bench_json_extract.py
+"""
+Benchmark the single-pass JSON locator against the previous regex helpers
+
+Usage:
+    python benchmarks/bench_json_extract.py [path/to/log.out] [--repeat N]
+
+The captured agent transcript is split into final answers and per-agent
+outputs, and each helper is timed over every sample, plus the whole transcript
+with a final answer appended (the worst case for long, verbose runs). The
+"valid" column counts samples where the helper returned parseable JSON.
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+import json5
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.utils import extract_json_block, find_json  # noqa: E402
+
+FINAL_ANSWER = """
+Final Answer:
+[
+  {"name": "TNO", "type": "research_institute", "website_url": "https://www.tno.nl",
+   "careers_url": "https://www.tno.nl/en/careers/", "location": "The Hague, Netherlands",
+   "size": "large", "industry": "Applied research", "tags": ["defence", "energy", ["nested"]],
+   "description": "Dutch organisation for applied scientific research [TNO]."}
+]
+"""
+
+
+def legacy_extract_json_array(text: str):
+    """Previous workflow.extract_json_array implementation."""
+    matches = re.findall(r'\[\s*(".*?"\s*(,\s*".*?")*)?\s*\]', text, re.DOTALL)
+    for match in re.finditer(r'\[[\s\S]*?\]', text):
+        try:
+            arr = json5.loads(match.group())
+            if isinstance(arr, list) and all(isinstance(x, str) for x in arr):
+                return arr
+        except Exception:
+            continue
+    return []
+
+
+def legacy_extract_json_block(text: str) -> str:
+    """Previous utils.extract_json_block implementation."""
+    patterns = [
+        r"```(?:json)?\s*(\[.*?\])\s*```",
+        r"```(?:json)?\s*(\{.*?\})\s*```",
+        r'(\[.*?\])',
+        r'(\{.*?\})'
+    ]
+    for pattern in patterns:
+        match = re.search(pattern, text, re.DOTALL)
+        if match:
+            return match.group(1)
+    raise ValueError("No valid JSON block found in the output.")
+
+
+def extract_json_array(text: str):
+    """Mirror of workflow.extract_json_array, which cannot be imported without crewai and the user config."""
+    arr = find_json(text, "[", lambda value: isinstance(value, list) and all(isinstance(x, str) for x in value))
+    return arr if arr is not None else []
+
+
+def parses(fn, text):
+    """Return True if ``fn`` found a block in ``text`` that json5 accepts."""
+    try:
+        result = fn(text)
+    except ValueError:
+        return False
+    if isinstance(result, list):
+        return bool(result)
+    try:
+        json5.loads(result)
+        return True
+    except ValueError:
+        return False
+
+
+def time_helper(fn, samples, repeat):
+    """Return (seconds per pass over all samples, total characters)."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in samples:
+            try:
+                fn(text)
+            except ValueError:
+                pass
+    elapsed = (time.perf_counter() - start) / repeat
+    return elapsed, sum(len(text) for text in samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("log", nargs="?", default="log.out")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    transcript = Path(args.log).read_text(encoding="utf-8")
+    outputs = [chunk for chunk in re.split(r"# Agent:", transcript) if chunk.strip()]
+    answers = [chunk.split("# Agent:")[0] for chunk in transcript.split("## Final Answer:")[1:]]
+
+    suites = {
+        f"{len(answers)} final answers": answers,
+        f"{len(outputs)} agent outputs": outputs,
+        "full transcript + final answer": [transcript + FINAL_ANSWER],
+    }
+    helpers = [
+        ("extract_json_array (regex)", legacy_extract_json_array),
+        ("extract_json_array (single pass)", extract_json_array),
+        ("extract_json_block (regex)", legacy_extract_json_block),
+        ("extract_json_block (single pass)", extract_json_block),
+    ]
+
+    print(f"{'suite':<34} {'helper':<34} {'ms/pass':>10} {'MB/s':>8} {'valid':>7}")
+    print("-" * 97)
+    for suite, samples in suites.items():
+        for label, fn in helpers:
+            elapsed, chars = time_helper(fn, samples, args.repeat)
+            valid = sum(parses(fn, text) for text in samples)
+            throughput = chars / elapsed / 1e6 if elapsed else float("inf")
+            print(f"{suite:<34} {label:<34} {elapsed * 1000:>10.2f} {throughput:>8.2f} {valid:>4}/{len(samples)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+# benchmarks/bench_matching.py
+"""
+Check the name matching regression cases, then time name clustering
+
+Usage:
+    python benchmarks/bench_matching.py [--names 5000 20000] [--seed 0]
+
+The regression cases are pairs of names that must (or must not) end up in
+the same cluster, names the exclusion index must (or must not) drop, and
+records deduplication must keep apart or merge.
+Any failure is listed and the script exits with status 1 before timing
+anything. The timing runs resolve_duplicate_names over generated
+institution names with spelling variants mixed in.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models.data_models import Institution  # noqa: E402
+from utils.matching import ExclusionIndex, deduplicate_institutions, resolve_duplicate_names  # noqa: E402
+
+# Spelling variants of one institution
+SAME_INSTITUTION = [
+    ("University of Amsterdam", "Universiteit van Amsterdm"),
+    ("University of Amsterdam", "Amsterdam University"),
+    ("TU Delft", "Delft University of Technology"),
+    ("ASML Holding N.V.", "ASML"),
+    ("Radboud UMC", "Radboud University Medical Centre"),
+]
+
+# Distinct institutions whose names share most of their words
+DIFFERENT_INSTITUTIONS = [
+    ("Netherlands Institute for Sea Research", "Netherlands Institute for Space Research"),
+    ("Royal Netherlands Institute for Sea Research", "Netherlands Institute for Space Research"),
+    ("Royal Netherlands Institute for Sea Research", "Netherlands Institute for Sea Research"),
+    ("Max Planck Institute for Informatics", "Max Planck Institute for Intelligent Systems"),
+    ("Fraunhofer ISE", "Fraunhofer IIS"),
+    ("Lab 1", "Lab 2"),
+    ("Max Planck Institute for Chemistry", "Max Planck Institute for Biochemistry"),
+    ("Institute of Physics", "Institute of Geophysics"),
+    ("Department of Informatics", "Department of Bioinformatics"),
+    ("Faculty of Applied Physics", "Faculty of Applied Biophysics"),
+]
+
+
+# Excluded names, aliases, and candidates with the excluded name they must match (None: kept)
+EXCLUDED = ["Meta", "Amazon", "ING Bank", "Shell"]
+EXCLUSION_ALIASES = {"Meta": ["Facebook"], "Amazon": ["AWS", "Amazon Web Services"]}
+EXCLUSION_CASES = [
+    ("Meta Platforms", None),
+    ("Meta Materials", None),
+    ("Metal", None),
+    ("Metaa", None),
+    ("Amazon Conservation Team", None),
+    ("Amazn", "Amazon"),
+    ("AWS", "Amazon"),
+    ("Amazon Web Services", "Amazon"),
+    ("Facebook", "Meta"),
+    ("ING Bank Nederland", "ING Bank"),
+    ("Shell plc", "Shell"),
+    ("Shell Energy Foundation", None),
+]
+
+
+def check_exclusions():
+    """Return a description of every exclusion case the index gets wrong."""
+    index = ExclusionIndex(EXCLUDED, EXCLUSION_ALIASES)
+    failures = []
+    for name, expected in EXCLUSION_CASES:
+        match = index.match(name)
+        if match != expected:
+            failures.append(f"exclusion of {name!r}: expected {expected!r}, got {match!r}")
+    return failures
+
+
+# Groups of (name, website) records and how many institutions each group must come out as
+DEDUP_CASES = [
+    ([("Max Planck Institute for Informatics", "https://www.mpi-inf.mpg.de/"),
+      ("Max Planck Institute for Intelligent Systems", "https://is.mpg.de/")], 2),
+    ([("Fraunhofer ISE", "https://www.ise.fraunhofer.de/"),
+      ("Fraunhofer IIS", "https://www.iis.fraunhofer.de/")], 2),
+    ([("Ministry of Defence", "https://www.government.nl/ministries/ministry-of-defence"),
+      ("Ministry of Economic Affairs", "https://www.government.nl/ministries/ministry-of-economic-affairs-and-climate-policy")], 2),
+    ([("TNO", "http://tno.nl"), ("TNO", "https://www.tno.nl/en/")], 1),
+    ([("TNO", "https://www.tno.nl/"), ("TNO", "https://careers.tno.nl/")], 1),
+    ([("ASML", "https://www.asml.com/"), ("ASML Holding N.V.", "")], 1),
+]
+
+
+def check_deduplication():
+    """Return a description of every dedup case that merges the wrong way."""
+    failures = []
+    for records, expected in DEDUP_CASES:
+        institutions = [Institution(name=name, type="company", website_url=url, careers_url="") for name, url in records]
+        merged, _ = deduplicate_institutions(institutions)
+        if len(merged) != expected:
+            failures.append(f"dedup of {[name for name, _ in records]}: expected {expected} records, got {len(merged)}")
+    return failures
+
+
+def check_name_clusters():
+    """Return a description of every regression case that clusters the wrong way."""
+    failures = []
+    for a, b in SAME_INSTITUTION:
+        kept, _ = resolve_duplicate_names([a, b])
+        if len(kept) != 1:
+            failures.append(f"not merged: {a!r} / {b!r}")
+    for a, b in DIFFERENT_INSTITUTIONS:
+        kept, _ = resolve_duplicate_names([a, b])
+        if len(kept) != 2:
+            failures.append(f"merged: {a!r} / {b!r}")
+    return failures
+
+
+WORDS = ["applied", "quantum", "marine", "energy", "robotics", "health", "data", "climate", "photonics",
+         "materials", "water", "space", "food", "logistics", "security", "finance", "mobility", "chemistry"]
+KINDS = ["Institute", "Lab", "University", "Centre", "Systems", "Technologies", "Foundation"]
+
+
+def generate_names(count: int, rng: random.Random):
+    """Generate ``count`` names, roughly one in five a misspelled or reordered copy of an earlier one."""
+    names = []
+    while len(names) < count:
+        if names and rng.random() < 0.2:
+            words = rng.choice(names).split()
+            i = rng.randrange(len(words))
+            if len(words[i]) > 4:
+                words[i] = words[i][:-2] + words[i][-1]
+            else:
+                rng.shuffle(words)
+            names.append(" ".join(words))
+        else:
+            words = rng.sample(WORDS, 2)
+            names.append(f"{words[0].title()} {words[1].title()} {rng.choice(KINDS)} {rng.randrange(1000)}")
+    return names
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--names", type=int, nargs="+", default=[5000, 20000])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    failures = check_name_clusters() + check_exclusions() + check_deduplication()
+    if failures:
+        print("Regression cases failed:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print(f"Regression cases: {len(SAME_INSTITUTION) + len(DIFFERENT_INSTITUTIONS) + len(EXCLUSION_CASES) + len(DEDUP_CASES)} passed")
+
+    print(f"{'names':>8} {'kept':>8} {'merged':>8} {'seconds':>8}")
+    for count in args.names:
+        names = generate_names(count, random.Random(args.seed))
+        start = time.perf_counter()
+        kept, duplicates = resolve_duplicate_names(names)
+        print(f"{count:>8} {len(kept):>8} {len(duplicates):>8} {time.perf_counter() - start:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+# benchmarks/bench_pipeline.py
+"""
+End-to-end benchmark of CompanyFinderFlow against local fake APIs
+
+Usage:
+    python benchmarks/bench_pipeline.py [--sizes 10 100 1000] [--workers 4] [--shards 4 | --queue-workers 2] ...
+
+For each size the complete workflow (discovery, detail crews, dedup, CSV)
+runs in a fresh working directory and subprocess, with a generated
+user_config.txt pointing LLM_BASE_URL, SERPER_BASE_URL and FIRECRAWL_API_URL
+at the fake services from fake_services.py. No API keys or network access are
+needed and no money is spent, so results are comparable between commits.
+
+Reported per size: wall time, time to the first researched institution,
+throughput (companies/min), p50/p95 per-company latency (from the run
+report), peak RSS of the run, and requests/errors seen by the fake services. --json writes the numbers for regression tracking.
+"""
+
+import argparse
+import glob
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_services import FakeServices, FakeWorld, ServiceProfile  # noqa: E402
+
+
+def write_config(directory: Path, base_url: str, interests, args):
+    """Write the user configuration the benchmark run loads."""
+    settings = {
+        "USER_INTERESTS": ", ".join(interests),
+        "GEOGRAPHIC_FOCUS": "Netherlands",
+        "SERPER_BASE_URL": base_url,
+        "FIRECRAWL_API_URL": base_url,
+        "LLM_BASE_URL": f"{base_url}/v1",
+        "LLM_MODEL": "gpt-4o-mini",
+        "LLM_CACHE": args.llm_cache,
+        "MAX_WORKERS": args.workers,
+        "MAX_DISCOVERY_WORKERS": args.workers,
+        "DETAIL_BATCH_SIZE": args.batch_size,
+        "CAREERS_FAST_PATH": "true" if args.careers_fast_path == "on" else "false",
+        "SHARD_PROCESSES": args.shards,
+        "JOB_QUEUE": f"sqlite:///{directory / 'jobs.db'}" if args.queue_workers else "",
+        "JOB_VISIBILITY_TIMEOUT_SECONDS": 120,
+        "JOB_WORKERS": max(1, args.queue_workers),
+        "MAX_RESULTS_PER_SEARCH": 5,
+        "STORE_RESULTS": "false",
+        "STREAM_OUTPUT": "true",
+        "VERBOSE_OUTPUT": "false",
+        "RETRY_BASE_DELAY_SECONDS": 0.1,
+        "SERPER_REQUESTS_PER_MINUTE": 60000,
+        "FIRECRAWL_REQUESTS_PER_MINUTE": 60000,
+        "LLM_REQUESTS_PER_MINUTE": 60000,
+        "SERPER_MAX_CONCURRENCY": args.workers * 2,
+        "FIRECRAWL_MAX_CONCURRENCY": args.workers * 2,
+        "LLM_MAX_CONCURRENCY": args.workers * 2,
+    }
+    (directory / "config").mkdir(parents=True, exist_ok=True)
+    lines = [f"{key}={value}" for key, value in settings.items()]
+    (directory / "config" / "user_config.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def run_child(directory: str, queue_workers: int = 0, streaming: bool = False):
+    """Run the workflow in the current process (inside the benchmark subprocess) and dump the measurements."""
+    os.chdir(directory)
+    from crews.company_research.workflow import run_complete_workflow
+
+    # Queue workers are separate processes, as they would be on other machines
+    workers = [subprocess.Popen([sys.executable, str(REPO_ROOT / "main.py"), "--worker"]) for _ in range(queue_workers)]
+    start = time.perf_counter()
+    try:
+        run_complete_workflow(streaming=streaming)
+    finally:
+        wall = time.perf_counter() - start
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.wait()
+
+    reports = sorted(glob.glob("checkpoints/report_*.json"))
+    report = json.loads(Path(reports[-1]).read_text(encoding="utf-8")) if reports else {}
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS; CHILDREN is the largest shard worker
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    peak_mb = peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+    Path("result.json").write_text(json.dumps({"wall": wall, "peak_mb": peak_mb, "report": report}), encoding="utf-8")
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def run_size(size: int, args) -> dict:
+    interests = [f"benchmark topic {i}" for i in range(max(1, min(args.interests, size)))]
+    world = FakeWorld(institutions=size, interests=interests)
+    profiles = {
+        "llm": ServiceProfile(latency_ms=args.llm_latency_ms, jitter_ms=args.llm_latency_ms / 5, error_rate=args.error_rate),
+        "search": ServiceProfile(latency_ms=args.search_latency_ms, jitter_ms=args.search_latency_ms / 5,
+                                 error_rate=args.error_rate),
+        "scrape": ServiceProfile(latency_ms=args.scrape_latency_ms, jitter_ms=args.scrape_latency_ms / 5,
+                                 error_rate=args.error_rate, response_bytes=args.scrape_bytes),
+    }
+
+    with FakeServices(world, seed=args.seed, **profiles) as services, \
+            tempfile.TemporaryDirectory(prefix=f"bench_{size}_") as directory:
+        write_config(Path(directory), services.base_url, interests, args)
+        env = {
+            **os.environ,
+            "PYTHONPATH": os.pathsep.join([str(REPO_ROOT), os.environ.get("PYTHONPATH", "")]),
+            "OPENAI_API_KEY": "fake",
+            "SERPER_API_KEY": "fake",
+            "FIRECRAWL_API_KEY": "fake",
+            # The fake websites live on 127.0.0.1, which the scrape tool refuses by default
+            "CREWAI_TOOLS_ALLOW_UNSAFE_PATHS": "true",
+            # ... and are reached through the fake server, which also proxies http://<slug>.test/
+            "HTTP_PROXY": services.base_url,
+            "NO_PROXY": "127.0.0.1,localhost",
+            "CREWAI_DISABLE_TELEMETRY": "true",
+            "OTEL_SDK_DISABLED": "true",
+        }
+        log_path = Path(directory) / "run.log"
+        with open(log_path, "w", encoding="utf-8") as log:
+            completed = subprocess.run([sys.executable, __file__, "--child", directory,
+                                        "--queue-workers", str(args.queue_workers)] + (["--streaming"] if args.streaming else []),
+                                       cwd=directory, env=env, stdout=log, stderr=subprocess.STDOUT)
+        result_path = Path(directory) / "result.json"
+        if completed.returncode != 0 or not result_path.exists():
+            tail = log_path.read_text(encoding="utf-8", errors="replace").splitlines()[-20:]
+            raise RuntimeError(f"Benchmark run for {size} institutions failed:\n" + "\n".join(tail))
+        if args.keep_logs:
+            kept = Path(f"bench_pipeline_{size}.log")
+            kept.write_text(log_path.read_text(encoding="utf-8", errors="replace"), encoding="utf-8")
+
+        result = json.loads(result_path.read_text(encoding="utf-8"))
+        companies = result["report"].get("companies", {})
+        latencies = [entry["seconds"] for entry in companies.values() if entry.get("status") == "done"]
+        return {
+            "institutions": size,
+            "done": len(latencies),
+            "failed": sum(1 for entry in companies.values() if entry.get("status") == "failed"),
+            "wall_seconds": round(result["wall"], 2),
+            "companies_per_min": round(len(latencies) / result["wall"] * 60, 1) if result["wall"] else 0.0,
+            "p50_seconds": round(statistics.median(latencies), 3) if latencies else 0.0,
+            "p95_seconds": round(percentile(latencies, 0.95), 3),
+            "first_result_seconds": result["report"].get("milestones", {}).get("first_result", 0.0),
+            "peak_mb": round(result["peak_mb"], 1),
+            "requests": dict(services.requests),
+            "errors": dict(services.errors),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--shards", type=int, default=1, help="SHARD_PROCESSES for the runs (0 = one per core)")
+    parser.add_argument("--queue-workers", type=int, default=0,
+                        help="Research through a SQLite JOB_QUEUE served by this many `main.py --worker` processes")
+    parser.add_argument("--streaming", action="store_true", help="Run the asyncio streaming pipeline instead of the flow")
+    parser.add_argument("--interests", type=int, default=5)
+    parser.add_argument("--llm-latency-ms", type=float, default=50)
+    parser.add_argument("--search-latency-ms", type=float, default=30)
+    parser.add_argument("--scrape-latency-ms", type=float, default=80)
+    parser.add_argument("--scrape-bytes", type=int, default=20000)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-cache", choices=["on", "off"], default="on")
+    parser.add_argument("--careers-fast-path", choices=["on", "off"], default="on")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="FILE", help="Also write the results to this JSON file")
+    parser.add_argument("--keep-logs", action="store_true", help="Copy each run's output to bench_pipeline_<size>.log")
+    parser.add_argument("--child", metavar="DIR", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.queue_workers, args.streaming)
+        return
+
+    print(f"{'institutions':>12} {'done':>6} {'failed':>6} {'wall s':>8} {'first s':>8} {'per min':>8} "
+          f"{'p50 s':>7} {'p95 s':>7} {'peak MB':>8} {'LLM req':>8} {'errors':>7}")
+    print("-" * 97)
+    results = []
+    for size in args.sizes:
+        row = run_size(size, args)
+        results.append(row)
+        print(f"{row['institutions']:>12} {row['done']:>6} {row['failed']:>6} {row['wall_seconds']:>8.1f} "
+              f"{row['first_result_seconds']:>8.1f} "
+              f"{row['companies_per_min']:>8.1f} {row['p50_seconds']:>7.2f} {row['p95_seconds']:>7.2f} "
+              f"{row['peak_mb']:>8.1f} {row['requests']['llm']:>8} {sum(row['errors'].values()):>7}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({"settings": vars(args), "results": results}, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
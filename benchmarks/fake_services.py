@@ -0,0 +1,408 @@
+# benchmarks/fake_services.py
+"""
+Local stand-ins for the OpenAI, Serper and Firecrawl APIs used by the benchmarks
+
+All three services run in one threaded HTTP server:
+
+    POST /v1/chat/completions   OpenAI-compatible chat completions
+    POST /search                Serper web search
+    POST /v2/scrape             Firecrawl scrape
+    HEAD http://<slug>.test/... The "institution websites" returned by search,
+                                reached with the server as HTTP proxy (HTTP_PROXY)
+
+The fake LLM plays the agents scripted: when the request offers tools it
+first calls the search tool, then the scrape tool, then answers. Answers
+depend on the task: discovery prompts get a JSON array of generated
+institution names ("Benchmark Org 0001", ...), detail and validation prompts
+get institution records for every generated name they mention. Four in five
+websites have their careers page at one of the standard paths, the rest at
+a path only the "agents" know.
+
+Latency, error rate (random 429/500 responses) and response sizes are
+configurable per service, and every response is deterministic for a given
+seed so runs are reproducible.
+
+FakeRedis is an in-memory stand-in for the subset of the redis-py client
+used by utils.jobs.RedisJobQueue, for exercising the queue without a server.
+"""
+
+import fnmatch
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+NAME_PATTERN = re.compile(r"Benchmark Org \d{4}")
+INTEREST_PATTERN = re.compile(r'strongly associated with "([^"]+)"')
+# Where the fake websites keep their careers page; the last one is not a standard path
+CAREERS_PATHS = ["/careers", "/jobs", "/werken-bij", "/vacancies", "/about-us/work-with-us"]
+
+
+@dataclass
+class ServiceProfile:
+    """Behaviour of one fake service."""
+    latency_ms: float = 50.0
+    jitter_ms: float = 10.0
+    error_rate: float = 0.0
+    response_bytes: int = 2000
+
+
+@dataclass
+class FakeWorld:
+    """The institutions the fake services know about."""
+    institutions: int = 10
+    interests: List[str] = field(default_factory=lambda: ["benchmark topic"])
+
+    def name(self, index: int) -> str:
+        return f"Benchmark Org {index:04d}"
+
+    def names_for_interest(self, interest: str) -> List[str]:
+        """Split the institutions evenly over the interests."""
+        position = self.interests.index(interest) if interest in self.interests else 0
+        return [self.name(i) for i in range(self.institutions) if i % len(self.interests) == position]
+
+    def slug(self, name: str) -> str:
+        return name.lower().replace(" ", "-")
+
+    def website(self, name: str) -> str:
+        return f"http://{self.slug(name)}.test/"
+
+    def careers_path(self, name: str) -> str:
+        return CAREERS_PATHS[int(name[-4:]) % len(CAREERS_PATHS)]
+
+    def serves(self, host: str, path: str) -> bool:
+        """Whether the website at ``host`` has a page at ``path``."""
+        match = re.fullmatch(r"benchmark-org-(\d{4})\.test", host)
+        if not match or int(match.group(1)) >= self.institutions:
+            return False
+        path = path.rstrip("/")
+        return path in ("", self.careers_path(self.name(int(match.group(1))))) or path.startswith("/news/")
+
+    def record(self, name: str) -> Dict[str, str]:
+        website = self.website(name)
+        return {
+            "name": name,
+            "type": "company",
+            "website_url": website,
+            "careers_url": website.rstrip("/") + self.careers_path(name),
+            "location": "Amsterdam, Netherlands",
+            "size": "medium",
+            "industry": "Benchmarking",
+            "interest_match": self.interests[int(name[-4:]) % len(self.interests)],
+            "description": f"{name} is a synthetic institution used for benchmarks.",
+        }
+
+
+def _message_text(messages: List[Dict]) -> str:
+    parts = []
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, list):
+            parts.extend(str(part.get("text", "")) for part in content if isinstance(part, dict))
+        elif content:
+            parts.append(str(content))
+    return "\n".join(parts)
+
+
+class FakeServices:
+    """Run the fake APIs on a local port; use as a context manager or call start()/stop()."""
+
+    def __init__(self, world: FakeWorld, llm: ServiceProfile = None, search: ServiceProfile = None,
+                 scrape: ServiceProfile = None, seed: int = 0, port: int = 0):
+        self.world = world
+        self.profiles = {
+            "llm": llm or ServiceProfile(),
+            "search": search or ServiceProfile(latency_ms=30),
+            "scrape": scrape or ServiceProfile(latency_ms=80, response_bytes=20000),
+        }
+        self.requests = {"llm": 0, "search": 0, "scrape": 0, "site": 0}
+        self.errors = {"llm": 0, "search": 0, "scrape": 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeServices":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _delay_and_maybe_fail(self, service: str) -> Optional[int]:
+        """Sleep for the service latency; return an error status to send, or None."""
+        profile = self.profiles[service]
+        with self._lock:
+            self.requests[service] += 1
+            delay = max(0.0, profile.latency_ms + self._random.uniform(-profile.jitter_ms, profile.jitter_ms)) / 1000
+            fail = self._random.random() < profile.error_rate
+            status = self._random.choice([429, 500]) if fail else None
+            if fail:
+                self.errors[service] += 1
+        time.sleep(delay)
+        return status
+
+    # --- responses -------------------------------------------------------
+
+    def chat_completion(self, body: Dict) -> Dict:
+        messages = body.get("messages", [])
+        text = _message_text(messages)
+        # Tool results mention institutions too; only the task prompt decides what is asked
+        prompt = _message_text([message for message in messages if message.get("role") in ("system", "user")])
+        tools = [tool["function"]["name"] for tool in body.get("tools", []) if tool.get("type") == "function"]
+        tool_results = sum(1 for message in messages if message.get("role") == "tool")
+
+        names = list(dict.fromkeys(NAME_PATTERN.findall(prompt)))
+        interest_match = INTEREST_PATTERN.search(prompt)
+        subject = names[0] if names else (interest_match.group(1) if interest_match else "benchmark")
+
+        search_tool = next((name for name in tools if "search" in name.lower()), None)
+        scrape_tool = next((name for name in tools if "scrape" in name.lower()), None)
+        if search_tool and tool_results == 0:
+            return self._tool_call(body, search_tool, {"search_query": f"{subject} careers"})
+        if scrape_tool and tool_results == 1:
+            url = self.world.website(subject)
+            return self._tool_call(body, scrape_tool, {"url": url})
+
+        if names:
+            records = [self.world.record(name) for name in names]
+            if "response_format" in body:
+                results = [{"query": r["name"], "excluded": False, "institution": r} for r in records]
+                content = json.dumps({"results": results} if len(results) > 1 else results[0])
+            elif len(records) > 1:
+                content = json.dumps([{"query": r["name"], **r} for r in records])
+            else:
+                content = json.dumps(records[0])
+        elif interest_match:
+            content = json.dumps(self.world.names_for_interest(interest_match.group(1)))
+        else:
+            content = "[]"
+        return self._completion(body, {"role": "assistant", "content": content}, "stop", text, content)
+
+    def _tool_call(self, body: Dict, tool: str, arguments: Dict) -> Dict:
+        call = {
+            "id": f"call_{self._random.getrandbits(48):012x}",
+            "type": "function",
+            "function": {"name": tool, "arguments": json.dumps(arguments)},
+        }
+        message = {"role": "assistant", "content": None, "tool_calls": [call]}
+        return self._completion(body, message, "tool_calls", _message_text(body.get("messages", [])), json.dumps(arguments))
+
+    def _completion(self, body: Dict, message: Dict, finish_reason: str, prompt: str, output: str) -> Dict:
+        prompt_tokens, completion_tokens = len(prompt) // 4 + 1, len(output) // 4 + 1
+        return {
+            "id": f"chatcmpl-{self._random.getrandbits(48):012x}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    def search_results(self, body: Dict) -> Dict:
+        query = str(body.get("q", ""))
+        names = NAME_PATTERN.findall(query) or [self.world.name(0)]
+        count = int(body.get("num", 10) or 10)
+        snippet = ("Synthetic search result. " * (self.profiles["search"].response_bytes // 25 // count + 1)).strip()
+        organic = [
+            {
+                "title": f"{names[0]} - result {i + 1}",
+                "link": self.world.website(names[0]) + (f"news/{i}" if i else ""),
+                "snippet": snippet,
+                "position": i + 1,
+            }
+            for i in range(count)
+        ]
+        return {"searchParameters": {"q": query}, "organic": organic}
+
+    def scrape_result(self, body: Dict) -> Dict:
+        url = str(body.get("url", ""))
+        size = self.profiles["scrape"].response_bytes
+        markdown = f"# {url}\n\n" + ("Synthetic page content for benchmarking. " * (size // 42 + 1))[:size]
+        return {"success": True, "data": {"markdown": markdown, "metadata": {"sourceURL": url, "statusCode": 200}}}
+
+    def _handler_class(self):
+        services = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, payload: Optional[Dict] = None, headers: Dict[str, str] = None):
+                data = json.dumps(payload).encode() if payload is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                if data and self.command != "HEAD":
+                    self.wfile.write(data)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                path = self.path.rstrip("/")
+                if path.endswith("/chat/completions"):
+                    service, respond = "llm", services.chat_completion
+                elif path.endswith("/search"):
+                    service, respond = "search", services.search_results
+                elif path.endswith("/scrape"):
+                    service, respond = "scrape", services.scrape_result
+                else:
+                    self._send(404, {"error": "not found"})
+                    return
+
+                status = services._delay_and_maybe_fail(service)
+                if status is not None:
+                    self._send(status, {"error": {"message": "injected failure", "code": status}},
+                               {"Retry-After": "0.1"} if status == 429 else None)
+                    return
+                self._send(200, respond(body))
+
+            def do_HEAD(self):
+                with services._lock:
+                    services.requests["site"] += 1
+                # Requests for the fake websites arrive as proxy requests with an absolute URL
+                url = urlsplit(self.path)
+                if services.world.serves(url.hostname or "", url.path):
+                    self._send(200, headers={"ETag": f'"{abs(hash(self.path))}"'})
+                else:
+                    self._send(404)
+
+            do_GET = do_HEAD
+
+        return Handler
+
+
+class FakeRedis:
+    """Thread-safe, in-memory subset of the redis-py client (decode_responses=True semantics)."""
+
+    def __init__(self):
+        self._data: Dict[str, object] = {}
+        self._expires: Dict[str, float] = {}
+        self._lock = threading.RLock()
+
+    def _get(self, name: str, default=None):
+        if name in self._expires and self._expires[name] <= time.time():
+            self._data.pop(name, None)
+            self._expires.pop(name, None)
+        return self._data.get(name, default)
+
+    def _hash(self, name: str) -> Dict[str, str]:
+        return self._data.setdefault(name, {}) if self._get(name) is None else self._data[name]
+
+    def set(self, name, value, nx=False, px=None):
+        with self._lock:
+            if nx and self._get(name) is not None:
+                return None
+            self._data[name] = str(value)
+            self._expires.pop(name, None)
+            if px is not None:
+                self._expires[name] = time.time() + px / 1000
+            return True
+
+    def get(self, name):
+        with self._lock:
+            return self._get(name)
+
+    def delete(self, *names):
+        with self._lock:
+            return sum(self._data.pop(name, None) is not None for name in names)
+
+    def hsetnx(self, name, key, value):
+        with self._lock:
+            fields = self._hash(name)
+            if key in fields:
+                return 0
+            fields[key] = str(value)
+            return 1
+
+    def hset(self, name, key=None, value=None, mapping=None):
+        with self._lock:
+            fields = self._hash(name)
+            items = dict(mapping or {})
+            if key is not None:
+                items[key] = value
+            fields.update({field: str(item) for field, item in items.items()})
+            return len(items)
+
+    def hget(self, name, key):
+        with self._lock:
+            return (self._get(name) or {}).get(key)
+
+    def hmget(self, name, keys):
+        with self._lock:
+            fields = self._get(name) or {}
+            return [fields.get(key) for key in keys]
+
+    def hgetall(self, name):
+        with self._lock:
+            return dict(self._get(name) or {})
+
+    def hincrby(self, name, key, amount=1):
+        with self._lock:
+            fields = self._hash(name)
+            fields[key] = str(int(fields.get(key, 0)) + amount)
+            return int(fields[key])
+
+    def zadd(self, name, mapping, nx=False, xx=False):
+        with self._lock:
+            scores = self._data.setdefault(name, {})
+            added = 0
+            for member, score in mapping.items():
+                exists = member in scores
+                if (nx and exists) or (xx and not exists):
+                    continue
+                added += not exists
+                scores[member] = float(score)
+            return added
+
+    def zrem(self, name, *members):
+        with self._lock:
+            scores = self._get(name) or {}
+            return sum(scores.pop(member, None) is not None for member in members)
+
+    def zrangebyscore(self, name, min, max, start=None, num=None):
+        low = float(min) if min != "-inf" else float("-inf")
+        high = float(max) if max != "+inf" else float("inf")
+        with self._lock:
+            members = sorted((score, member) for member, score in (self._get(name) or {}).items()
+                             if low <= score <= high)
+        members = [member for _, member in members]
+        if start is not None:
+            members = members[start:start + num if num is not None else None]
+        return members
+
+    def scan_iter(self, match="*", count=None):
+        with self._lock:
+            names = [name for name in list(self._data) if self._get(name) is not None]
+        return iter([name for name in names if fnmatch.fnmatchcase(name, match)])
+
+    def close(self):
+        pass
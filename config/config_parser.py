@@ -16,6 +16,16 @@ def parse_boolean_value(value: str) -> bool:
     """Parse a string into a boolean value."""
     return value.lower().strip() in ('true', 'yes', '1', 'on')
 
+def parse_alias_value(value: str) -> Dict[str, List[str]]:
+    """Parse "Name: Alias | Alias, Name: Alias" into a mapping of names to their aliases."""
+    aliases = {}
+    for group in parse_list_value(value):
+        if ':' not in group:
+            continue
+        name, names = group.split(':', 1)
+        aliases[name.strip()] = [alias.strip() for alias in names.split('|') if alias.strip()]
+    return aliases
+
 def load_user_config(config_file: str = "config/user_config.txt") -> Dict[str, Any]:
     """
     Load user configuration from a text file.
@@ -65,15 +75,18 @@ def load_user_config(config_file: str = "config/user_config.txt") -> Dict[str, A
     
     return config
 
-def get_user_configuration() -> Dict[str, Any]:
+def get_user_configuration(config_file: str = "config/user_config.txt") -> Dict[str, Any]:
     """
     Get processed user configuration with defaults and validation.
     
+    Args:
+        config_file: Path to the user configuration file
+        
     Returns:
         Dictionary with all configuration values needed by the system
     """
     # Load raw configuration
-    raw_config = load_user_config()
+    raw_config = load_user_config(config_file)
     
     # Process and validate configuration
     processed_config = {
@@ -89,6 +102,10 @@ def get_user_configuration() -> Dict[str, Any]:
         # Company preferences
         'USER_PROVIDED_COMPANIES': parse_list_value(raw_config.get('COMPANIES_OF_INTEREST', '')),
         'USER_PROVIDED_COMPANIES_NO': parse_list_value(raw_config.get('COMPANIES_TO_EXCLUDE', '')),
+        'EXCLUSION_CONFIG': {
+            'aliases': parse_alias_value(raw_config.get('COMPANY_ALIASES', '')),
+            'fuzzy_threshold': float(raw_config.get('EXCLUSION_FUZZY_THRESHOLD', '0.88'))
+        },
         
         # Search preferences
         'INSTITUTION_TYPES': parse_list_value(raw_config.get('INSTITUTION_TYPES', 
@@ -98,13 +115,86 @@ def get_user_configuration() -> Dict[str, Any]:
         'SEARCH_CONFIG': {
             'location': raw_config.get('SEARCH_LOCATION', 'Europe'),
             'locale': raw_config.get('SEARCH_LOCALE', 'en-GB'),
-            'n_results': int(raw_config.get('MAX_RESULTS_PER_SEARCH', '10'))
+            'n_results': int(raw_config.get('MAX_RESULTS_PER_SEARCH', '10')),
+            'base_url': raw_config.get('SERPER_BASE_URL', 'https://google.serper.dev')
+        },
+        
+        # Scrape configuration
+        'SCRAPE_CONFIG': {
+            'api_url': raw_config.get('FIRECRAWL_API_URL', 'https://api.firecrawl.dev')
         },
         
         # Output configuration
         'OUTPUT_CONFIG': {
             'csv_filename': raw_config.get('OUTPUT_FILENAME', 'institutions_job_research.csv'),
-            'verbose': parse_boolean_value(raw_config.get('VERBOSE_OUTPUT', 'false'))
+            'verbose': parse_boolean_value(raw_config.get('VERBOSE_OUTPUT', 'false')),
+            'stream': parse_boolean_value(raw_config.get('STREAM_OUTPUT', 'true')),
+            'stream_fsync': parse_boolean_value(raw_config.get('STREAM_FSYNC', 'false')),
+            'store': parse_boolean_value(raw_config.get('STORE_RESULTS', 'true')),
+            'store_path': raw_config.get('STORE_PATH', 'institutions.db')
+        },
+        
+        # Execution configuration
+        'EXECUTION_CONFIG': {
+            'max_workers': int(raw_config.get('MAX_WORKERS', '4')),
+            'max_discovery_workers': int(raw_config.get('MAX_DISCOVERY_WORKERS', '4')),
+            'detail_batch_size': int(raw_config.get('DETAIL_BATCH_SIZE', '1')),
+            'careers_fast_path': parse_boolean_value(raw_config.get('CAREERS_FAST_PATH', 'true')),
+            'careers_paths': ['/' + path.strip('/') for path in
+                              parse_list_value(raw_config.get('CAREERS_PATHS', '/careers, /jobs, /werken-bij, /vacancies'))],
+            'shard_processes': int(raw_config.get('SHARD_PROCESSES', '1')),
+            'job_queue': raw_config.get('JOB_QUEUE', ''),
+            'job_visibility_timeout': float(raw_config.get('JOB_VISIBILITY_TIMEOUT_SECONDS', '900')),
+            'job_workers': int(raw_config.get('JOB_WORKERS', '1')),
+            'name_match_threshold': float(raw_config.get('NAME_MATCH_THRESHOLD', '0.9')),
+            'checkpoint_dir': raw_config.get('CHECKPOINT_DIR', 'checkpoints'),
+            'refresh_max_age_days': float(raw_config.get('REFRESH_MAX_AGE_DAYS', '30')),
+            'company_timeout_seconds': float(raw_config.get('COMPANY_TIMEOUT_SECONDS', '600')),
+            'company_token_budget': int(raw_config.get('COMPANY_TOKEN_BUDGET', '200000')),
+            'max_retries': int(raw_config.get('MAX_RETRIES', '3')),
+            'retry_base_delay': float(raw_config.get('RETRY_BASE_DELAY_SECONDS', '2'))
+        },
+        
+        # LLM configuration
+        'LLM_CONFIG': {
+            'model': raw_config.get('LLM_MODEL', os.getenv('OPENAI_MODEL_NAME', 'gpt-4o-mini')),
+            'base_url': raw_config.get('LLM_BASE_URL', os.getenv('OPENAI_BASE_URL', '')),
+            'cache_mode': raw_config.get('LLM_CACHE', 'on').lower(),
+            'timeout_seconds': float(raw_config.get('LLM_TIMEOUT_SECONDS', '120')),
+            'structured_output': parse_boolean_value(raw_config.get('STRUCTURED_OUTPUT', 'false'))
+        },
+        
+        # Rate limits per provider
+        'RATE_LIMIT_CONFIG': {
+            'serper': {
+                'requests_per_minute': float(raw_config.get('SERPER_REQUESTS_PER_MINUTE', '300')),
+                'max_concurrency': int(raw_config.get('SERPER_MAX_CONCURRENCY', '5'))
+            },
+            'firecrawl': {
+                'requests_per_minute': float(raw_config.get('FIRECRAWL_REQUESTS_PER_MINUTE', '100')),
+                'max_concurrency': int(raw_config.get('FIRECRAWL_MAX_CONCURRENCY', '4'))
+            },
+            'llm': {
+                'requests_per_minute': float(raw_config.get('LLM_REQUESTS_PER_MINUTE', '500')),
+                'max_concurrency': int(raw_config.get('LLM_MAX_CONCURRENCY', '8'))
+            }
+        },
+        
+        # Prices used to estimate the cost of a run in the run report
+        'COST_CONFIG': {
+            'llm_input_per_mtok': float(raw_config.get('LLM_INPUT_COST_PER_MTOK', '0.15')),
+            'llm_output_per_mtok': float(raw_config.get('LLM_OUTPUT_COST_PER_MTOK', '0.60')),
+            'search_per_1k': float(raw_config.get('SERPER_COST_PER_1K', '1.0')),
+            'scrape_per_1k': float(raw_config.get('FIRECRAWL_COST_PER_1K', '5.0'))
+        },
+        
+        # Cache configuration
+        'CACHE_CONFIG': {
+            'cache_dir': raw_config.get('CACHE_DIR', '.cache'),
+            'search_ttl_hours': float(raw_config.get('SEARCH_CACHE_TTL_HOURS', '168')),
+            'search_max_entries': int(raw_config.get('SEARCH_CACHE_MAX_ENTRIES', '5000')),
+            'scrape_max_age_hours': float(raw_config.get('SCRAPE_CACHE_MAX_AGE_HOURS', '72')),
+            'scrape_max_entries': int(raw_config.get('SCRAPE_CACHE_MAX_ENTRIES', '2000'))
         }
     }
     
@@ -116,6 +206,41 @@ def get_user_configuration() -> Dict[str, Any]:
         print("Warning: No geographic focus specified. Using default: Netherlands")
         processed_config['GEOGRAPHIC_FOCUS'] = ['Netherlands']
     
+    if processed_config['EXECUTION_CONFIG']['max_workers'] < 1:
+        raise ValueError("MAX_WORKERS must be at least 1.")
+    
+    if processed_config['LLM_CONFIG']['cache_mode'] not in ('on', 'off', 'replay'):
+        raise ValueError("LLM_CACHE must be one of: on, off, replay.")
+    
+    if processed_config['EXECUTION_CONFIG']['max_discovery_workers'] < 1:
+        raise ValueError("MAX_DISCOVERY_WORKERS must be at least 1.")
+    
+    if processed_config['EXECUTION_CONFIG']['detail_batch_size'] < 1:
+        raise ValueError("DETAIL_BATCH_SIZE must be at least 1.")
+    
+    if processed_config['EXECUTION_CONFIG']['shard_processes'] < 0:
+        raise ValueError("SHARD_PROCESSES cannot be negative.")
+    
+    if processed_config['EXECUTION_CONFIG']['job_visibility_timeout'] <= 0:
+        raise ValueError("JOB_VISIBILITY_TIMEOUT_SECONDS must be positive.")
+    
+    if processed_config['EXECUTION_CONFIG']['job_workers'] < 1:
+        raise ValueError("JOB_WORKERS must be at least 1.")
+    
+    if processed_config['EXECUTION_CONFIG']['max_retries'] < 0:
+        raise ValueError("MAX_RETRIES cannot be negative.")
+    
+    for provider, limits in processed_config['RATE_LIMIT_CONFIG'].items():
+        if limits['requests_per_minute'] <= 0 or limits['max_concurrency'] < 1:
+            raise ValueError(f"{provider.upper()}_REQUESTS_PER_MINUTE must be positive "
+                             f"and {provider.upper()}_MAX_CONCURRENCY at least 1.")
+    
+    if not 0 < processed_config['EXECUTION_CONFIG']['name_match_threshold'] <= 1:
+        raise ValueError("NAME_MATCH_THRESHOLD must be between 0 and 1.")
+    
+    if not 0 < processed_config['EXCLUSION_CONFIG']['fuzzy_threshold'] <= 1:
+        raise ValueError("EXCLUSION_FUZZY_THRESHOLD must be between 0 and 1.")
+    
     return processed_config
 
 def print_configuration_summary(config: Dict[str, Any]):
@@ -142,4 +267,7 @@ def print_configuration_summary(config: Dict[str, Any]):
     
     print(f"Search Location: {config['SEARCH_CONFIG']['location']}")
     print(f"Output File: {config['OUTPUT_CONFIG']['csv_filename']}")
+    print(f"LLM: {config['LLM_CONFIG']['model']} (cache: {config['LLM_CONFIG']['cache_mode']})")
+    print(f"Parallel Workers: {config['EXECUTION_CONFIG']['max_workers']} "
+          f"(discovery: {config['EXECUTION_CONFIG']['max_discovery_workers']})")
     print("-" * 40)
\ No newline at end of file
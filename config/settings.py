@@ -55,47 +55,105 @@
 # config/settings.py
 """
 Configuration settings for the Job Search System
-Loads user configuration from user_config.txt
+Loads user configuration from user_config.txt on first use
+
+Importing this module does no I/O. The configuration is parsed the first
+time a setting is read and cached per file, so several configurations can
+be used in one process:
+
+    from config import settings
+    settings.SEARCH_CONFIG['location']          # default file
+    with settings.use_config("other.txt"):      # this thread and its workers
+        settings.SEARCH_CONFIG['location']
 """
 
+import contextvars
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Optional
+
 from .config_parser import get_user_configuration, print_configuration_summary
 
-# Load user configuration
-try:
-    _user_config = get_user_configuration()
-    
+DEFAULT_CONFIG_FILE = "config/user_config.txt"
+
+# Settings readable as module attributes, e.g. settings.USER_INTERESTS
+SETTING_NAMES = [
     # Personal Information
-    CV_FILE_PATH = _user_config['CV_FILE_PATH']
-    LINKEDIN_PROFILE = _user_config['LINKEDIN_PROFILE']
-    EMAIL = _user_config['EMAIL']
-    
+    'CV_FILE_PATH', 'LINKEDIN_PROFILE', 'EMAIL',
     # Job Search Configuration
-    USER_INTERESTS = _user_config['USER_INTERESTS']
-    GEOGRAPHIC_FOCUS = _user_config['GEOGRAPHIC_FOCUS']
-    INSTITUTION_TYPES = _user_config['INSTITUTION_TYPES']
-    
+    'USER_INTERESTS', 'GEOGRAPHIC_FOCUS', 'INSTITUTION_TYPES',
     # Company Preferences
-    USER_PROVIDED_COMPANIES = _user_config['USER_PROVIDED_COMPANIES']
-    USER_PROVIDED_COMPANIES_NO = _user_config['USER_PROVIDED_COMPANIES_NO']
-    
+    'USER_PROVIDED_COMPANIES', 'USER_PROVIDED_COMPANIES_NO', 'EXCLUSION_CONFIG',
     # Search and Output Configuration
-    SEARCH_CONFIG = _user_config['SEARCH_CONFIG']
-    OUTPUT_CONFIG = _user_config['OUTPUT_CONFIG']
-    
-    # Print configuration summary when loaded
-    print_configuration_summary(_user_config)
-    
-except FileNotFoundError as e:
-    print("❌ Configuration Error:")
-    print(e)
-    print("\n📝 Please create and fill the config/user_config.txt file.")
-    print("You can use the template provided in config/user_config.txt")
-    raise
-    
-except Exception as e:
-    print(f"❌ Error loading user configuration: {e}")
-    raise
+    'SEARCH_CONFIG', 'SCRAPE_CONFIG', 'OUTPUT_CONFIG', 'EXECUTION_CONFIG', 'CACHE_CONFIG',
+    'LLM_CONFIG', 'RATE_LIMIT_CONFIG', 'COST_CONFIG',
+]
+
+_configs: Dict[str, Dict[str, Any]] = {}
+_lock = threading.Lock()
+_default_file = DEFAULT_CONFIG_FILE
+_active_file: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("config_file", default=None)
+
+
+def config_file() -> str:
+    """Return the configuration file used by the current context."""
+    return _active_file.get() or _default_file
+
+
+def get_config(path: Optional[str] = None) -> Dict[str, Any]:
+    """Return the parsed configuration of ``path`` (default: the current one), loading it on first use."""
+    key = str(Path(path or config_file()).resolve())
+    with _lock:
+        if key not in _configs:
+            try:
+                _configs[key] = get_user_configuration(path or config_file())
+            except FileNotFoundError as e:
+                print("❌ Configuration Error:")
+                print(e)
+                print("\n📝 Please create and fill the config/user_config.txt file.")
+                print("You can use the template provided in config/user_config.txt")
+                raise
+            except Exception as e:
+                print(f"❌ Error loading user configuration: {e}")
+                raise
+        return _configs[key]
+
+
+def set_config_file(path: str):
+    """Use ``path`` as the process-wide default configuration file."""
+    global _default_file
+    _default_file = path
+
+
+@contextmanager
+def use_config(path: str):
+    """Read settings from ``path`` inside this block (propagates to workers started with the context)."""
+    token = _active_file.set(path)
+    try:
+        yield get_config(path)
+    finally:
+        _active_file.reset(token)
+
+
+def reload_config(path: Optional[str] = None) -> Dict[str, Any]:
+    """Drop the cached configuration of ``path`` and parse it again."""
+    with _lock:
+        _configs.pop(str(Path(path or config_file()).resolve()), None)
+    return get_config(path)
+
+
+def print_config_summary():
+    """Print a summary of the current configuration."""
+    print_configuration_summary(get_config())
+
 
 def get_full_config():
     """Return the full user configuration dictionary."""
-    return _user_config
\ No newline at end of file
+    return get_config()
+
+
+def __getattr__(name: str):
+    if name in SETTING_NAMES:
+        return get_config()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,8 +1,16 @@
 # crews/__init__.py
 """
 Crews package for the Job Search System
+
+Crews are imported on first use, so importing the package loads neither
+crewai nor the user configuration.
 """
 
-from .company_research import run_company_research
+__all__ = ['run_company_research']
+
 
-__all__ = ['run_company_research']
\ No newline at end of file
+def __getattr__(name):
+    if name in __all__:
+        from . import company_research
+        return getattr(company_research, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
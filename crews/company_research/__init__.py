@@ -3,6 +3,11 @@
 Company research crew
 """
 
-from .workflow import run_company_research, CompanyFinderFlow
+__all__ = ['run_company_research', 'CompanyFinderFlow']
 
-__all__ = ['run_company_research', 'CompanyFinderFlow']
\ No newline at end of file
+
+def __getattr__(name):
+    if name in __all__:
+        from . import workflow
+        return getattr(workflow, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -3,17 +3,36 @@
 Agents for company research crew
 """
 
+import threading
+from contextlib import contextmanager
 from crewai import Agent
-from crewai_tools import SerperDevTool, ScrapeWebsiteTool
-from crewai_tools import FirecrawlScrapeWebsiteTool
-search_tool =  SerperDevTool(
-    # search_url="https://google.serper.dev/search",
-    # country="NL",  # Change to your preferred EU country
-    location="Europe",
-    locale="en-GB",
-    n_results=10
-)
-scrape_tool = FirecrawlScrapeWebsiteTool()
+from config import settings
+from utils.pool import ObjectPool
+from .tools import CachedSerperDevTool, CachedFirecrawlScrapeWebsiteTool
+from .llm import get_llm
+
+_tools = {}
+_tools_lock = threading.Lock()
+_agent_pools = {}
+
+
+def get_research_tools():
+    """Return the search and scrape tools shared by all agents, created on first use for the current configuration."""
+    key = settings.config_file()
+    with _tools_lock:
+        if key not in _tools:
+            search_config = settings.SEARCH_CONFIG
+            search_tool = CachedSerperDevTool(
+                # search_url="https://google.serper.dev/search",
+                # country="NL",  # Change to your preferred EU country
+                location=search_config['location'],
+                locale=search_config['locale'],
+                n_results=search_config['n_results'],
+                base_url=search_config['base_url']
+            )
+            _tools[key] = [search_tool, CachedFirecrawlScrapeWebsiteTool()]
+        return list(_tools[key])
+
 def create_company_finder_agent():
     """Agent specialized in finding institutions and companies by interest areas or similarity with other companies."""
     return Agent(
@@ -22,7 +41,8 @@ def create_company_finder_agent():
         backstory="""You are an expert at finding companies and organizations that match the interests, locations, and companies of interets of the user. You have deep knowledge of academic institutions, 
         companies, and research organizations across different domains.""",
         verbose=True,
-        tools=[search_tool, FirecrawlScrapeWebsiteTool()],
+        llm=get_llm(),
+        tools=get_research_tools(),
         allow_delegation=False
     )
 
@@ -34,7 +54,8 @@ def create_company_scraper_agent():
         backstory="""You are an expert at scraping all the relevant information about a company. You have deep knowledge of academic institutions, 
         companies, and research organizations across different domains.""",
         verbose=True,
-        tools=[search_tool, FirecrawlScrapeWebsiteTool()],
+        llm=get_llm(),
+        tools=get_research_tools(),
         allow_delegation=False
     )
 
@@ -46,6 +67,42 @@ def create_validator_agent():
         backstory="""You are meticulous at verifying information about institutions. 
         You are able to find duplicates and remove them. You combine the data from different sources into a single JSON list.""",
         verbose=True,
+        llm=get_llm(),
         tools=[],
         allow_delegation=False
-    )
\ No newline at end of file
+    )
+
+
+AGENT_FACTORIES = {
+    "finder": create_company_finder_agent,
+    "scraper": create_company_scraper_agent,
+    "validator": create_validator_agent,
+}
+
+
+def _reset_agent(agent):
+    """Clear what the previous crew left on a pooled agent."""
+    agent.tools_results.clear()
+    agent.llm.reset_usage()
+
+
+def get_agent_pool(kind: str) -> ObjectPool:
+    """Return the pool of "finder", "scraper" or "validator" agents for the current configuration."""
+    key = (kind, settings.config_file())
+    with _tools_lock:
+        if key not in _agent_pools:
+            _agent_pools[key] = ObjectPool(AGENT_FACTORIES[kind], reset=_reset_agent)
+        return _agent_pools[key]
+
+
+@contextmanager
+def checkout_agent(kind: str):
+    """
+    Borrow a prebuilt agent for one crew and return it to the pool afterwards.
+
+    Building an agent sets up its LLM client, which costs more than the rest
+    of a crew's setup; pooled agents also keep their connections to the LLM
+    provider alive between crews. An agent is only used by one crew at a time.
+    """
+    with get_agent_pool(kind).checkout() as agent:
+        yield agent
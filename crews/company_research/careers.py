@@ -0,0 +1,121 @@
+# crews/company_research/careers.py
+"""
+Careers page fast path: find likely website and careers URLs without the LLM, as hints for the agents
+"""
+
+import re
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from config import settings
+from utils.matching import NAME_STOPWORDS, normalize_name
+from utils.retry import BudgetExceeded
+from utils.urls import SHARED_HOSTS, registrable_domain
+
+from .agents import get_research_tools
+from .tools import get_session
+
+PROBE_TIMEOUT = 5
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def _names_site(name: str, domain: str) -> bool:
+    """
+    Whether ``domain`` spells out the organisation's name, e.g. tno.nl for "TNO" or asml.com for "ASML Holding".
+
+    The first label must be the whole name without spaces, the acronym of a
+    name of three or more words, or
+    consecutive words covering most of the name ("deltares" for "Deltares
+    Research"). A single word of a longer name is usually a city or a
+    generic word (eindhoven.nl, bank.nl), so it never matches.
+    """
+    label = _NON_ALNUM.sub('', domain.split('.')[0])
+    tokens = [token for token in normalize_name(name).split() if token not in NAME_STOPWORDS]
+    if not label or not tokens:
+        return False
+    if label == ''.join(tokens) or (len(tokens) > 2 and label == ''.join(token[0] for token in tokens)):
+        return True
+    return any(label == ''.join(tokens[start:start + size])
+               for size in range(len(tokens) // 2 + 1, len(tokens))
+               for start in range(len(tokens) - size + 1))
+
+
+def resolve_homepage(name: str) -> Optional[str]:
+    """Return the root URL of the first search result hosted on the organisation's own domain."""
+    search_tool = get_research_tools()[0]
+    results = search_tool.run(search_query=name)
+    for result in results.get("organic", []) if isinstance(results, dict) else []:
+        link = result.get("link") or ""
+        domain = registrable_domain(link)
+        if domain and domain not in SHARED_HOSTS and _names_site(name, domain):
+            parts = urlsplit(link)
+            return f"{parts.scheme}://{parts.netloc}/"
+    return None
+
+
+def probe(url: str) -> Optional[str]:
+    """Return the URL ``url`` ends up at if it answers 200, else None."""
+    session = get_session()
+    try:
+        response = session.head(url, timeout=PROBE_TIMEOUT, allow_redirects=True)
+        if response.status_code in (403, 405):
+            # Some servers refuse HEAD; fetch the headers of a GET instead
+            with session.get(url, timeout=PROBE_TIMEOUT, allow_redirects=True, stream=True) as response:
+                pass
+    except requests.RequestException:
+        return None
+    return response.url if response.status_code == 200 else None
+
+
+def _lands_on(url: Optional[str], path: str) -> bool:
+    """Whether a probe of ``path`` ended on a page that still has it in its path, e.g. /careers -> /en/careers/."""
+    return url is not None and path.strip('/').lower() in urlsplit(url).path.lower()
+
+
+def find_careers_page(name: str) -> Dict[str, str]:
+    """
+    Resolve ``name``'s homepage with one (cached) search and probe the usual careers paths.
+
+    The homepage, a random path and every path in CAREERS_PATHS are checked
+    concurrently with HEAD requests. A site that answers 200 for the random
+    path serves every URL (a catch-all or single-page app), so nothing on it
+    can be verified this way. Otherwise the first path, in configured order,
+    that answers 200 and does not redirect away from that path (e.g. to the
+    homepage or a language root) wins. Returns whichever of ``website_url``
+    and ``careers_url`` were found, possibly neither. The homepage is only
+    matched on its name, so callers pass these to the agent as hints rather
+    than as verified values.
+    """
+    try:
+        homepage = resolve_homepage(name)
+    except BudgetExceeded:
+        raise
+    except Exception as e:
+        print(f"⚠️ Careers fast path search failed for {name}: {e}")
+        return {}
+    if homepage is None:
+        return {}
+
+    paths = settings.EXECUTION_CONFIG['careers_paths']
+    urls = [homepage, f"{homepage}{uuid.uuid4().hex}"] + [homepage.rstrip('/') + path for path in paths]
+    with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+        website, catch_all, *careers = executor.map(probe, urls)
+    if catch_all:
+        print(f"⚠️ {name}: {homepage} answers every path, careers page left to the agents")
+        return {}
+
+    found = {}
+    if website:
+        found["website_url"] = homepage
+    for path, url in zip(paths, careers):
+        if _lands_on(url, path):
+            found["careers_url"] = url
+            break
+    if found:
+        print(f"⚡ {name}: {', '.join(f'{field} {url}' for field, url in found.items())}")
+    return found
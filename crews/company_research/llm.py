@@ -0,0 +1,158 @@
+# crews/company_research/llm.py
+"""
+LLM factory with on-disk response memoization and rate limiting
+"""
+
+from typing import Any, Optional
+from crewai import LLM
+from crewai.llms.base_llm import BaseLLM
+from pydantic import PrivateAttr
+from config import settings
+from utils.cache import get_cache, make_cache_key
+from utils.metrics import get_run_metrics
+from utils.retry import check_budget, current_budget
+from .tasks import PROMPT_TEMPLATE_VERSION
+from .tools import call_provider
+
+# Configuration entries that end up inside prompts; changing any of them invalidates cached responses
+PROMPT_CONFIG_KEYS = [
+    'USER_INTERESTS',
+    'GEOGRAPHIC_FOCUS',
+    'USER_PROVIDED_COMPANIES',
+    'USER_PROVIDED_COMPANIES_NO',
+    'INSTITUTION_TYPES',
+    'SEARCH_CONFIG',
+]
+
+
+class LLMCacheMiss(RuntimeError):
+    """Raised in replay mode when a prompt has no cached response."""
+
+
+def get_llm_cache():
+    """Return the shared on-disk cache for LLM responses."""
+    return get_cache("llm", settings.CACHE_CONFIG['cache_dir'], compress=True)
+
+
+def get_prompt_config_hash() -> str:
+    """Hash the configuration values that influence prompt contents."""
+    config = settings.get_full_config()
+    return make_cache_key(*[config.get(key) for key in PROMPT_CONFIG_KEYS])
+
+
+class CachedLLM(BaseLLM):
+    """
+    LLM wrapper that memoizes text responses by prompt hash and rate limits real calls.
+
+    The key covers the model name, PROMPT_TEMPLATE_VERSION, the prompt-related
+    configuration and the full message list, so any change to what the model
+    would see produces a fresh call. In "replay" mode only cached responses
+    are returned and a miss raises LLMCacheMiss; in "off" mode nothing is
+    cached. Calls that reach the provider go through the "llm" rate limiter,
+    are retried on transient errors and charged to the current company's
+    token budget. Each request times out after LLM_TIMEOUT_SECONDS or when
+    the company's time budget runs out, whichever comes first.
+    """
+
+    mode: str = "on"
+    _inner: Any = PrivateAttr(None)
+    _config_hash: str = PrivateAttr("")
+    _usage_start: Any = PrivateAttr(None)
+
+    def __init__(self, inner: Any, mode: str = "on", **kwargs: Any):
+        super().__init__(model=inner.model, mode=mode, **kwargs)
+        self._inner = inner
+        self._config_hash = get_prompt_config_hash()
+
+    def _cache_key(self, messages: Any, tools: Optional[list]) -> str:
+        tool_names = sorted(str(tool.get("name", tool)) if isinstance(tool, dict) else str(tool) for tool in tools or [])
+        return make_cache_key(self.model, PROMPT_TEMPLATE_VERSION, self._config_hash, messages, tool_names)
+
+    def _token_counts(self):
+        try:
+            usage = self._inner.get_token_usage_summary()
+            return usage.prompt_tokens, usage.completion_tokens
+        except Exception:
+            return 0, 0
+
+    def reset_usage(self):
+        """Report token usage from here on, so a pooled agent's next crew does not see the previous crews' tokens."""
+        self._usage_start = self._inner.get_token_usage_summary()
+
+    def get_token_usage_summary(self):
+        # Crews read token usage from their agents' LLM, which is the wrapped one
+        usage = self._inner.get_token_usage_summary()
+        if self._usage_start is None:
+            return usage
+        return type(usage)(**{field: getattr(usage, field) - getattr(self._usage_start, field)
+                              for field in type(usage).model_fields})
+
+    def _request_timeout(self) -> float:
+        timeout = settings.LLM_CONFIG['timeout_seconds']
+        budget = current_budget()
+        remaining = budget.remaining_seconds() if budget is not None else None
+        return timeout if remaining is None else max(min(timeout, remaining), 1.0)
+
+    def _call_inner(self, messages, tools, callbacks, available_functions, **kwargs) -> Any:
+        # Native OpenAI-compatible providers keep an SDK client; bound this request's wait on a copy of it
+        client = getattr(self._inner, "_client", None)
+        if not hasattr(client, "with_options"):
+            return self._inner.call(messages, tools=tools, callbacks=callbacks,
+                                    available_functions=available_functions, **kwargs)
+        self._inner._client = client.with_options(timeout=self._request_timeout())
+        try:
+            return self._inner.call(messages, tools=tools, callbacks=callbacks,
+                                    available_functions=available_functions, **kwargs)
+        finally:
+            self._inner._client = client
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs) -> Any:
+        check_budget()
+        key = self._cache_key(messages, tools)
+        cache = get_llm_cache() if self.mode != "off" else None
+
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                get_run_metrics().record_llm_call(cached=True)
+                return cached
+        if self.mode == "replay":
+            raise LLMCacheMiss(f"No cached LLM response for this prompt (model {self.model}) in replay mode")
+
+        # Agent executors may set stop words on the wrapper; forward them to the real LLM
+        if self.stop:
+            self._inner.stop = self.stop
+        prompt_before, completion_before = self._token_counts()
+        response = call_provider("llm", lambda: self._call_inner(messages, tools, callbacks, available_functions, **kwargs))
+
+        prompt_after, completion_after = self._token_counts()
+        prompt_tokens, completion_tokens = prompt_after - prompt_before, completion_after - completion_before
+        if prompt_tokens + completion_tokens <= 0:
+            # Roughly four characters per token when the provider reports no usage
+            prompt_tokens, completion_tokens = len(str(messages)) // 4, len(str(response)) // 4
+        get_run_metrics().record_llm_call(cached=False, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+
+        budget = current_budget()
+        if budget is not None:
+            budget.charge(prompt_tokens + completion_tokens)
+        if isinstance(response, str) and cache is not None:
+            cache.set(key, response)
+        return response
+
+    def supports_function_calling(self) -> bool:
+        return self._inner.supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return self._inner.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self._inner.get_context_window_size()
+
+
+def get_llm():
+    """Return the LLM used by the agents, wrapped in the response cache and rate limiter."""
+    config = settings.LLM_CONFIG
+    options = {"base_url": config['base_url']} if config['base_url'] else {}
+    # Retries are left to call_provider, which backs off within the company's budget
+    llm = LLM(model=config['model'], timeout=config['timeout_seconds'], max_retries=0, **options)
+    return CachedLLM(llm, mode=config['cache_mode'])
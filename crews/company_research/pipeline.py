@@ -0,0 +1,219 @@
+# crews/company_research/pipeline.py
+"""
+Streaming variant of CompanyFinderFlow: asyncio stages joined by bounded queues
+
+    discovery --names--> enrichment workers --outcomes--> dedup + sinks
+
+Names are handed to enrichment as soon as an interest search returns them,
+and institutions reach the sinks as soon as they are researched, instead of
+every stage waiting for the previous one to finish. The queues are bounded,
+so discovery pauses when enrichment falls behind. Crews still run in worker
+threads; the event loop only moves names and results between them.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+from config import settings
+from models.data_models import Institution
+from utils.journal import RunJournal
+from utils.matching import InstitutionDeduplicator, NameClusters
+from utils.metrics import get_run_metrics
+from utils.utils import load_institution_store
+
+from .workflow import (
+    ResultRecorder,
+    checkpointed_outcomes,
+    discover_companies_for_interest,
+    fresh_record,
+    get_exclusion_index,
+    research_batch,
+    write_results_csv,
+)
+
+# Queue slots per enrichment worker: enough to keep workers busy without running far ahead
+QUEUE_SIZE_PER_WORKER = 2
+
+# Marks the end of a stage's output
+_END = None
+
+
+class NameStream:
+    """
+    Discovered names, filtered one at a time as they arrive.
+
+    Spelling variants of a name already passed on are merged into it and
+    excluded companies are dropped, as the batch flow does for the whole
+    list at once. A late name that bridges two earlier clusters cannot undo
+    names already researched, so the streaming result may keep a few more
+    variants than the batch flow.
+    """
+
+    def __init__(self):
+        self.clusters = NameClusters(threshold=settings.EXECUTION_CONFIG['name_match_threshold'])
+        self.exclusion_index = get_exclusion_index()
+        self.names: List[str] = []
+        self._seen = set()
+
+    def accept(self, name: str) -> bool:
+        kept = self.clusters.add(name)
+        if kept is None or name in self._seen:
+            return False
+        if kept != name:
+            print(f"🔗 Merging {name} into {kept}")
+            return False
+        self._seen.add(name)
+        # Companies the user asked for explicitly are always kept
+        match = self.exclusion_index.match(name) if name not in settings.USER_PROVIDED_COMPANIES else None
+        if match:
+            print(f"🚫 Skipping {name} (excluded: {match})")
+            return False
+        self.names.append(name)
+        return True
+
+
+async def discover(names_out: asyncio.Queue, journal: RunJournal, skip: Callable[[str], bool]):
+    """Run the interest searches concurrently and stream every new, allowed name to ``names_out``."""
+    stream = NameStream()
+
+    async def offer(name: str):
+        if stream.accept(name) and not skip(name):
+            await names_out.put(name)
+
+    for name in settings.USER_PROVIDED_COMPANIES:
+        await offer(name)
+
+    semaphore = asyncio.Semaphore(settings.EXECUTION_CONFIG['max_discovery_workers'])
+
+    async def search(interest: str):
+        async with semaphore:
+            names = await asyncio.to_thread(discover_companies_for_interest, interest)
+        for name in names:
+            await offer(name)
+
+    await asyncio.gather(*(search(interest) for interest in settings.USER_INTERESTS))
+    journal.record_names(stream.names)
+    print(f"\n📦 Discovery complete: {len(stream.names)} unique institutions")
+    return stream.names
+
+
+async def replay(names_out: asyncio.Queue, names: List[str], skip: Callable[[str], bool]):
+    """Stream a known name list (resumed run or dead-letter retry) to ``names_out``."""
+    for name in names:
+        if not skip(name):
+            await names_out.put(name)
+    return names
+
+
+async def enrich(names_in: asyncio.Queue, outcomes_out: asyncio.Queue, batch_size: int):
+    """Research names from ``names_in`` in batches and stream the (name, result, error) outcomes on."""
+    finished = False
+    while not finished:
+        batch = [await names_in.get()]
+        # Fill the batch with names that are already waiting, without holding up the first one
+        while len(batch) < batch_size and not names_in.empty():
+            batch.append(names_in.get_nowait())
+        if _END in batch:
+            finished = True
+            batch = [name for name in batch if name is not _END]
+            # Let the other workers see the end too
+            await names_in.put(_END)
+        if batch:
+            for outcome in await asyncio.to_thread(research_batch, batch):
+                await outcomes_out.put(outcome)
+    await outcomes_out.put(_END)
+
+
+async def collect(outcomes_in: asyncio.Queue, workers: int, record: ResultRecorder,
+                  deduplicator: InstitutionDeduplicator):
+    """Checkpoint, publish and deduplicate outcomes until every enrichment worker has finished."""
+    running = workers
+    while running:
+        outcome = await outcomes_in.get()
+        if outcome is _END:
+            running -= 1
+            continue
+        name, result, error = outcome
+        await asyncio.to_thread(record, name, result, error)
+        if isinstance(result, Institution):
+            deduplicator.add(result)
+
+
+async def run_pipeline(journal_path: str, resume: bool = False, previous_results: str = "",
+                       retry_names: Optional[List[str]] = None,
+                       publish: Optional[Callable] = None) -> Tuple[Optional[str], List[Institution]]:
+    """
+    Run discovery, enrichment, deduplication and the sinks as overlapping stages.
+
+    Takes the same inputs as CompanyFinderFlow and returns the results CSV
+    (None if nothing was found) and the deduplicated institutions.
+    """
+    execution = settings.EXECUTION_CONFIG
+    workers = execution['max_workers']
+    # Crews run in threads; size the pool for the discovery and enrichment workers together
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=workers + execution['max_discovery_workers']))
+
+    journal = RunJournal(journal_path)
+    record = ResultRecorder(journal, publish or (lambda name, result: None))
+    deduplicator = InstitutionDeduplicator()
+    metrics = get_run_metrics()
+
+    # Outcomes already checkpointed by an interrupted run, and fresh records from a previous run
+    known = checkpointed_outcomes(journal) if resume else {}
+    store = load_institution_store(previous_results, execution['name_match_threshold']) if previous_results else None
+
+    def skip(name: str) -> bool:
+        """Reuse a known outcome for ``name`` instead of researching it again."""
+        result = known.get(name)
+        if result is None and store is not None:
+            result = fresh_record(store, name)
+        if result is None:
+            return False
+        if publish:
+            publish(name, result)
+        if isinstance(result, Institution):
+            deduplicator.add(result)
+        return True
+
+    names_queue: asyncio.Queue = asyncio.Queue(maxsize=workers * QUEUE_SIZE_PER_WORKER)
+    outcomes_queue: asyncio.Queue = asyncio.Queue(maxsize=workers * QUEUE_SIZE_PER_WORKER)
+
+    checkpoint = journal.load() if resume else {"names": None}
+    if retry_names:
+        print(f"\n🔁 Retrying {len(retry_names)} institutions from the dead-letter list")
+        journal.record_names(retry_names)
+        source = replay(names_queue, retry_names, skip)
+    elif checkpoint["names"] is not None:
+        print(f"\n♻️ Resuming {journal.path}: reusing {len(checkpoint['names'])} discovered institutions")
+        source = replay(names_queue, checkpoint["names"], skip)
+    else:
+        source = discover(names_queue, journal, skip)
+
+    async def produce():
+        with metrics.stage("pipeline_discovery"):
+            names = await source
+        await names_queue.put(_END)
+        return names
+
+    print(f"\n🌊 Streaming pipeline: {execution['max_discovery_workers']} discovery workers, "
+          f"{workers} enrichment workers, queues of {names_queue.maxsize}")
+    with metrics.stage("pipeline"):
+        names, *_ = await asyncio.gather(
+            produce(),
+            *(enrich(names_queue, outcomes_queue, execution['detail_batch_size']) for _ in range(workers)),
+            collect(outcomes_queue, workers, record, deduplicator),
+        )
+
+    failed = [name for name, result in record.results.items() if result is None]
+    if failed:
+        print(f"\n📮 {len(failed)} institutions failed and were added to {record.dead_letters.path}; "
+              f"run `python main.py --retry-failed` to try them again")
+
+    details = deduplicator.institutions
+    print(f"\n🧹 Deduplication: {deduplicator.merged_count} merged, {len(details)} institutions from {len(names)} names")
+    if not details:
+        print("No institution details to save.")
+        return None, details
+    return write_results_csv(details), details
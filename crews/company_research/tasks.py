@@ -4,13 +4,17 @@ Tasks for company research crew
 """
 
 from crewai import Task
-from config.settings import GEOGRAPHIC_FOCUS, USER_PROVIDED_COMPANIES, USER_PROVIDED_COMPANIES_NO
+from config import settings
+from models.data_models import InstitutionResult, InstitutionBatchResult
+
+# Bump whenever a prompt below changes so cached LLM responses are invalidated
+PROMPT_TEMPLATE_VERSION = 2
 
 def create_company_finding_task(agent, interest: str):
     """Create task for researching institutions by interest."""
     return Task(
         description=f"""
-        Research and identify institutions that are strongly associated with "{interest}" in the following regions: {', '.join(GEOGRAPHIC_FOCUS)}.
+        Research and identify institutions that are strongly associated with "{interest}" in the following regions: {', '.join(settings.GEOGRAPHIC_FOCUS)}.
 
         You should the following:
         - Universities with notable programs in {interest}
@@ -44,7 +48,7 @@ def create_extend_company_finding_task(agent, interest: str):
     """Create task for expanding institution search, avoiding duplicates."""
     return Task(
         description=f"""
-        You previously found institutions related to "{interest}" in {', '.join(GEOGRAPHIC_FOCUS)}.
+        You previously found institutions related to "{interest}" in {', '.join(settings.GEOGRAPHIC_FOCUS)}.
         
         Now, find **additional institutions** that fit the same topic and were NOT previously listed. These might include:
         - Smaller or less well-known organizations
@@ -74,7 +78,7 @@ def create_similar_company_finding_task(agent, company: str):
     """Create task for finding institutions similar to user-provided companies."""
     return Task(
         description=f"""
-        Companies, start-ups and universities in {', '.join(GEOGRAPHIC_FOCUS)} that are similar to this institution: {company}
+        Companies, start-ups and universities in {', '.join(settings.GEOGRAPHIC_FOCUS)} that are similar to this institution: {company}
         
         Guidelines:
         - Find details about the company
@@ -101,13 +105,140 @@ def create_similar_company_finding_task(agent, company: str):
 
 
 
-def create_company_detail_finding_task(agent, company):
-    """Create task for researching all the important details about a company."""
+def _create_batch_detail_finding_task(agent, companies, structured: bool = False, known=None):
+    """Create task for researching the details of several companies in one conversation."""
+    known = known or {}
+    company_list = "\n".join(
+        f'        - "{company}"' + (f" (likely {', '.join(f'{field} {url}' for field, url in known[company].items())})"
+                                   if known.get(company) else "")
+        for company in companies
+    )
+    hint = ("\n\n        Likely URLs in brackets come from a quick check; use them only after confirming they belong to that company."
+            if any(known.values()) else "")
+
+    if structured:
+        return Task(
+            description=f"""
+        Research each of the following companies:
+{company_list}{hint}
+
+        Return one result per company, in the same order, with `query` set to the company name exactly as written above.
+
+        If a company is in this list of excluded companies: {settings.USER_PROVIDED_COMPANIES_NO}
+        - Set `excluded` to true and leave `institution` empty.
+
+        Otherwise, set `excluded` to false and fill `institution` with:
+        - `name`: Exact institution name
+        - `type`: One of university, company, startup, research_institute, government
+        - `website_url`: Must be a valid and working URL (status 200)
+        - `careers_url`: A valid working URL where jobs are listed
+        - `location`: City and Country
+        - `size`: One of small, medium, large, enterprise
+        - `industry`: Main industry or domain
+        - `description`: Concise, meaningful summary of what this institution does
+        """,
+            expected_output="One research result per company.",
+            agent=agent,
+            output_pydantic=InstitutionBatchResult,
+        )
+
+    return Task(
+        description=f"""
+        Research each of the following companies:
+{company_list}{hint}
+
+        For every company, return one JSON object with `query` set to the company name exactly as written above.
+
+        If a company is in this list of excluded companies: {settings.USER_PROVIDED_COMPANIES_NO}
+        - Return only {{"query": "<company>", "excluded": true}} for it.
+
+        Otherwise, add the following fields:
+        - `name`: Exact institution name
+        - `type`: One of university, company, startup, research_institute, government
+        - `website_url`: Must be a valid and working URL (status 200)
+        - `careers_url`: A valid working URL where jobs are listed
+        - `location`: City and Country
+        - `size`: One of small, medium, large, enterprise
+        - `industry`: Main industry or domain
+        - `description`: Concise, meaningful summary of what this institution does
+
+        Output rules:
+        - Return a single JSON array with one object per company, in the same order
+        - DO NOT return markdown or explanation
+
+        Example:
+        [
+          {{
+            "query": "ACME",
+            "name": "ACME Robotics",
+            "type": "startup",
+            "website_url": "https://acmerobotics.com",
+            "careers_url": "https://acmerobotics.com/careers",
+            "location": "Berlin, Germany",
+            "size": "small",
+            "industry": "Robotics",
+            "description": "ACME Robotics develops autonomous drone systems for industrial use."
+          }},
+          {{"query": "Amazon", "excluded": true}}
+        ]
+        """,
+        expected_output="A JSON array with one object per company.",
+        agent=agent,
+    )
+
+def _url_hints(known) -> str:
+    """Prompt lines handing over the URLs found by the careers fast path as a starting point for the agent."""
+    if not known:
+        return ""
+    lines = "\n".join(f"        - `{field}`: {value}" for field, value in known.items())
+    return f"""
+
+        A quick check found these likely URLs. Use them only after confirming they belong to this company:
+{lines}"""
+
+
+def create_company_detail_finding_task(agent, company, structured: bool = False, known=None):
+    """
+    Create task for researching all the important details about a company.
+
+    ``company`` may also be a list of names, in which case a single batched
+    task covers all of them. With ``structured=True`` the task returns an
+    InstitutionResult (or InstitutionBatchResult) through crewai's
+    ``output_pydantic`` instead of free-text JSON. ``known`` maps the URL
+    fields found by the careers fast path (website_url, careers_url) to
+    their values, or each company name to such a mapping for batches.
+    """
+    if isinstance(company, (list, tuple)):
+        return _create_batch_detail_finding_task(agent, company, structured, known)
+
+    if structured:
+        return Task(
+            description=f"""
+        Research the company: "{company}"{_url_hints(known)}
+
+        If the company is in this list of excluded companies: {settings.USER_PROVIDED_COMPANIES_NO}
+        - Set `excluded` to true and leave `institution` empty.
+
+        Otherwise, set `excluded` to false and fill `institution` with:
+        - `name`: Exact institution name
+        - `type`: One of university, company, startup, research_institute, government
+        - `website_url`: Must be a valid and working URL (status 200)
+        - `careers_url`: A valid working URL where jobs are listed
+        - `location`: City and Country
+        - `size`: One of small, medium, large, enterprise
+        - `industry`: Main industry or domain
+        - `description`: Concise, meaningful summary of what this institution does
+        """,
+            expected_output="The research result for this company.",
+            agent=agent,
+            output_pydantic=InstitutionResult,
+        )
+
     return Task(
         description=f"""
-        Research the company: "{company}"
+        Research the company: "{company}"{_url_hints(known)}
 
-        If the company is in this list of excluded companies: {USER_PROVIDED_COMPANIES_NO}
+        If the company is in this list of excluded companies: {settings.USER_PROVIDED_COMPANIES_NO}
         - Return only the string: `"delete"` and nothing else.
 
         Otherwise, return a single JSON object with the following fields:
@@ -141,8 +272,47 @@ def create_company_detail_finding_task(agent, company):
         agent=agent,
     )
 
-def create_validation_task(agent, previous_task):
+def create_validation_task(agent, previous_task, structured: bool = False, batch: bool = False):
     """Create task for validating and consolidating institution results."""
+    if batch:
+        return Task(
+            description="""
+        You are validating the results returned from the previous task, one per company.
+
+        - Keep results marked as excluded unchanged.
+        - Keep the `query` of every result exactly as it is.
+
+        For every other result:
+        - Double-check that `website_url` and `careers_url` are both working (status 200 and not redirecting to error pages).
+        - Improve or correct the `description` if vague or incorrect.
+        - Fix any formatting issues.
+
+        Return all results, in the same format and order as the previous task. No markdown. No explanation.
+        """,
+            expected_output="The validated results, one per company.",
+            agent=agent,
+            context=[previous_task],
+            output_pydantic=InstitutionBatchResult if structured else None,
+        )
+
+    if structured:
+        return Task(
+            description="""
+        You are validating the research result returned from the previous task.
+
+        - If the previous result has `excluded` set to true, return it unchanged.
+
+        Otherwise, review the institution and ensure it is correct and complete:
+        - Double-check that `website_url` and `careers_url` are both working (status 200 and not redirecting to error pages).
+        - Improve or correct the `description` if vague or incorrect.
+        - Fix any formatting issues.
+        """,
+            expected_output="The validated research result for this company.",
+            agent=agent,
+            context=[previous_task],
+            output_pydantic=InstitutionResult,
+        )
+
     return Task(
         description=f"""
         You are validating the details returned from the previous task.
@@ -0,0 +1,239 @@
+# crews/company_research/tools.py
+"""
+Cached wrappers around the search and scrape tools
+"""
+
+import os
+import time
+import requests
+from typing import Any, Callable, Dict, TypeVar
+from crewai_tools import SerperDevTool, FirecrawlScrapeWebsiteTool
+from config import settings
+from utils.cache import get_cache, make_cache_key, normalize_query
+from utils.metrics import get_run_metrics
+from utils.pool import get_http_session
+from utils.rate_limit import RateLimiter, get_rate_limiter
+from utils.retry import check_budget, retry_call
+from utils.urls import canonicalize_url
+
+try:
+    from firecrawl.v2.utils.http_client import HttpClient
+except ImportError:  # firecrawl-py is an optional extra of crewai_tools
+    HttpClient = None
+
+VALIDATOR_TIMEOUT = 10
+SEARCH_TIMEOUT = 10
+
+T = TypeVar("T")
+
+
+def get_search_cache():
+    """Return the shared on-disk cache for search results."""
+    return get_cache(
+        "search",
+        settings.CACHE_CONFIG['cache_dir'],
+        ttl_seconds=settings.CACHE_CONFIG['search_ttl_hours'] * 3600,
+        max_entries=settings.CACHE_CONFIG['search_max_entries']
+    )
+
+
+def get_scrape_cache():
+    """Return the shared, compressed on-disk cache for scraped pages."""
+    return get_cache(
+        "scrape",
+        settings.CACHE_CONFIG['cache_dir'],
+        max_entries=settings.CACHE_CONFIG['scrape_max_entries'],
+        compress=True
+    )
+
+
+def get_provider_limiter(provider: str) -> RateLimiter:
+    """Return the shared rate limiter for "serper", "firecrawl" or "llm"."""
+    return get_rate_limiter(provider, **settings.RATE_LIMIT_CONFIG[provider])
+
+
+def split_rate_limits(processes: int):
+    """
+    Give this process its share of every provider's quota when ``processes`` processes share it.
+
+    Limiters are per process, so without this each shard or queue worker
+    would send requests at the full configured rate. Must run before the
+    limiters are first used.
+    """
+    for provider, limits in settings.RATE_LIMIT_CONFIG.items():
+        get_rate_limiter(provider, limits['requests_per_minute'] / processes,
+                         max(1, limits['max_concurrency'] // processes))
+
+
+def get_session() -> requests.Session:
+    """Return the keep-alive HTTP session shared by search, scrape and validation requests."""
+    concurrency = [limits['max_concurrency'] for limits in settings.RATE_LIMIT_CONFIG.values()]
+    return get_http_session(max(settings.EXECUTION_CONFIG['max_workers'], *concurrency))
+
+
+def call_provider(provider: str, fn: Callable[[], T]) -> T:
+    """
+    Make one request to a provider under its rate limiter.
+
+    Fails fast when the current company is over budget and retries transient
+    failures with jittered exponential backoff.
+    """
+    check_budget()
+    limiter = get_provider_limiter(provider)
+
+    def attempt():
+        with limiter.limit():
+            return fn()
+
+    return retry_call(attempt, attempts=settings.EXECUTION_CONFIG['max_retries'] + 1,
+                      base_delay=settings.EXECUTION_CONFIG['retry_base_delay'])
+
+
+def fetch_validators(url: str, cached: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Issue a HEAD request and return the page's ETag/Last-Modified validators.
+
+    When ``cached`` validators are given they are sent as a conditional request
+    and the result carries ``not_modified=True`` if the page is unchanged.
+    """
+    headers = {}
+    if cached and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached and cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+
+    response = get_session().head(url, headers=headers, timeout=VALIDATOR_TIMEOUT, allow_redirects=True)
+    validators = {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+    unchanged = bool(cached) and any(
+        validators[field] and validators[field] == cached.get(field) for field in ("etag", "last_modified")
+    )
+    validators["not_modified"] = response.status_code == 304 or unchanged
+    return validators
+
+
+class CachedSerperDevTool(SerperDevTool):
+    """SerperDevTool that serves repeated searches from the on-disk cache."""
+
+    def _run(self, **kwargs: Any) -> Any:
+        search_query = kwargs.get("search_query") or kwargs.get("query")
+        search = super()._run
+        if not search_query or kwargs.get("save_file"):
+            get_run_metrics().record_tool_call("search", cached=False)
+            return call_provider("serper", lambda: search(**kwargs))
+
+        key = make_cache_key(
+            normalize_query(search_query),
+            kwargs.get("search_type", self.search_type),
+            self.country,
+            self.location,
+            self.locale,
+            self.n_results
+        )
+        cache = get_search_cache()
+        cached = cache.get(key)
+        get_run_metrics().record_tool_call("search", cached=cached is not None)
+        if cached is not None:
+            return cached
+
+        results = call_provider("serper", lambda: search(**kwargs))
+        cache.set(key, results)
+        return results
+
+    def _make_api_request(self, search_query: str, search_type: str) -> Dict[str, Any]:
+        # Same request as the stock tool, over the shared keep-alive session instead of a new connection
+        payload = {"q": search_query, "num": self.n_results}
+        for field, value in (("gl", self.country), ("location", self.location), ("hl", self.locale)):
+            if value != "":
+                payload[field] = value
+        headers = {"X-API-KEY": os.environ["SERPER_API_KEY"], "content-type": "application/json"}
+        response = get_session().post(self._get_search_url(search_type), headers=headers, json=payload,
+                                      timeout=SEARCH_TIMEOUT)
+        response.raise_for_status()
+        results = response.json()
+        if not results:
+            raise ValueError("Empty response from Serper API")
+        return dict(results)
+
+
+if HttpClient is not None:
+    class SessionHttpClient(HttpClient):
+        """
+        Firecrawl HTTP client that sends POST requests (scrapes) over the shared keep-alive session.
+
+        Retries are left to call_provider, which already wraps every scrape.
+        """
+
+        def post(self, endpoint: str, data: Dict[str, Any], headers: Dict[str, str] = None,
+                 timeout: float = None, **kwargs: Any) -> requests.Response:
+            payload = dict(data)
+            payload['origin'] = payload.get('origin') or self.origin
+            return get_session().post(self._build_url(endpoint), headers=headers or self._prepare_headers(),
+                                      json=payload, timeout=timeout if timeout is not None else self.timeout)
+
+
+class CachedFirecrawlScrapeWebsiteTool(FirecrawlScrapeWebsiteTool):
+    """
+    FirecrawlScrapeWebsiteTool that keeps scraped pages in the on-disk cache.
+
+    Pages are keyed by canonical URL. Entries younger than the configured max
+    age are served as-is; older ones are revalidated with a conditional HEAD
+    request and only scraped again if the page changed. The cache lock ensures
+    concurrent workers (threads or processes) scrape a given URL only once.
+    """
+
+    def __init__(self, api_key: str = None, **kwargs: Any):
+        super().__init__(api_key=api_key, **kwargs)
+        # The stock tool always talks to the hosted API; honour FIRECRAWL_API_URL for proxies and self-hosting
+        if self._firecrawl is not None and settings.SCRAPE_CONFIG['api_url'] != self._firecrawl.api_url:
+            self._firecrawl = type(self._firecrawl)(api_key=api_key or os.getenv("FIRECRAWL_API_KEY"),
+                                                   api_url=settings.SCRAPE_CONFIG['api_url'])
+        client = getattr(self._firecrawl, "_v2_client", None)
+        if client is not None and HttpClient is not None:
+            http = client.http_client
+            client.http_client = SessionHttpClient(http.api_key, http.api_url, timeout=http.timeout,
+                                                   max_retries=http.max_retries, backoff_factor=http.backoff_factor,
+                                                   origin=http.origin)
+
+    def _run(self, url: str) -> Any:
+        key = canonicalize_url(url)
+        cache = get_scrape_cache()
+        max_age = settings.CACHE_CONFIG['scrape_max_age_hours'] * 3600
+
+        with cache.lock(key):
+            entry = cache.get_entry(key)
+            if entry is not None:
+                page, fetched_at = entry
+                if time.time() - fetched_at <= max_age:
+                    cache.record(hit=True)
+                    get_run_metrics().record_tool_call("scrape", cached=True)
+                    return page["content"]
+                try:
+                    if fetch_validators(url, page)["not_modified"]:
+                        cache.touch(key)
+                        cache.record(hit=True)
+                        get_run_metrics().record_tool_call("scrape", cached=True)
+                        return page["content"]
+                except requests.RequestException:
+                    pass
+
+            cache.record(hit=False)
+            get_run_metrics().record_tool_call("scrape", cached=False)
+            scrape = super()._run
+            result = call_provider("firecrawl", lambda: scrape(url))
+            content = getattr(result, "markdown", None) or str(result)
+
+            try:
+                validators = fetch_validators(url)
+            except requests.RequestException:
+                validators = {}
+
+            cache.set(key, {
+                "url": url,
+                "content": content,
+                "etag": validators.get("etag"),
+                "last_modified": validators.get("last_modified"),
+            })
+            return content
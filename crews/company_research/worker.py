@@ -0,0 +1,159 @@
+# crews/company_research/worker.py
+"""
+Queue workers: research companies enqueued by a coordinator on any machine
+"""
+
+import os
+import socket
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from config import settings
+from models.data_models import Institution
+from utils.jobs import FAILED, Job, JobQueue, open_job_queue, print_progress
+from utils.metrics import get_run_metrics, start_run_metrics
+
+from .tools import split_rate_limits
+
+# Seconds between polls of the queue by idle workers and by the coordinator
+POLL_INTERVAL = 2.0
+# Seconds between progress lines printed by the coordinator
+PROGRESS_INTERVAL = 30.0
+
+
+def get_job_queue() -> JobQueue:
+    """Open the configured JOB_QUEUE."""
+    execution = settings.EXECUTION_CONFIG
+    if not execution['job_queue']:
+        raise ValueError("JOB_QUEUE is not set in config/user_config.txt")
+    return open_job_queue(execution['job_queue'],
+                          visibility_timeout=execution['job_visibility_timeout'],
+                          max_attempts=execution['max_retries'] + 1)
+
+
+def job_key(run_id: str, name: str) -> str:
+    """Key of the job researching ``name`` for run ``run_id``; the same name is only queued once per run."""
+    return f"{run_id}/{' '.join(name.split()).lower()}"
+
+
+def run_job(job: Job) -> Dict[str, Any]:
+    """Research the company of one job and return the result pushed back to the coordinator."""
+    from .workflow import research_batch
+
+    name = job.payload["name"]
+    [(_, result, error)] = research_batch([name])
+    if result == "delete":
+        outcome = {"outcome": "excluded"}
+    elif result is None:
+        outcome = {"outcome": "failed", "error": error}
+    else:
+        outcome = {"outcome": "done", "institution": result.model_dump()}
+    return {"name": name, **outcome, "metrics": get_run_metrics().take_company(name)}
+
+
+def run_worker(idle_exit: Optional[float] = None, max_jobs: Optional[int] = None):
+    """
+    Pull jobs from JOB_QUEUE and research them with MAX_WORKERS threads.
+
+    Workers keep no state between jobs, so any number of them can run on
+    any number of machines sharing the queue and configuration. Each takes
+    1/JOB_WORKERS of every provider's rate limit. Returns after
+    ``idle_exit`` seconds without work or ``max_jobs`` jobs, if given.
+    """
+    queue = get_job_queue()
+    split_rate_limits(settings.EXECUTION_CONFIG['job_workers'])
+    start_run_metrics(settings.COST_CONFIG)
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    threads = settings.EXECUTION_CONFIG['max_workers']
+    lock = threading.Lock()
+    state = {"jobs": 0, "last_work": time.monotonic()}
+    stop = threading.Event()
+
+    def loop(index: int):
+        while not stop.is_set():
+            with lock:
+                if max_jobs is not None and state["jobs"] >= max_jobs:
+                    return
+                state["jobs"] += 1
+            job = queue.claim(f"{worker_id}:{index}")
+            if job is None:
+                with lock:
+                    state["jobs"] -= 1
+                    idle = time.monotonic() - state["last_work"]
+                if idle_exit is not None and idle >= idle_exit:
+                    return
+                stop.wait(POLL_INTERVAL)
+                continue
+            if stop.is_set():
+                queue.release(job)
+                return
+            print(f"\n📥 {worker_id}:{index} researching {job.payload['name']} (attempt {job.attempts})")
+            queue.complete(job, run_job(job))
+            with lock:
+                state["last_work"] = time.monotonic()
+
+    print(f"👷 Worker {worker_id} pulling from {settings.EXECUTION_CONFIG['job_queue']} with {threads} threads")
+    workers: List[threading.Thread] = [threading.Thread(target=loop, args=(i,), daemon=True) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    try:
+        for thread in workers:
+            while thread.is_alive():
+                thread.join(timeout=1)
+    except KeyboardInterrupt:
+        # Jobs in flight are abandoned; their visibility timeout hands them to another worker
+        stop.set()
+        print("\n⏹ Worker stopping")
+    finally:
+        queue.close()
+    print(f"👷 Worker {worker_id} finished {state['jobs']} jobs")
+
+
+def research_via_queue(names: List[str], run_id: str, record):
+    """
+    Enqueue one job per name and ``record`` every result as workers push it back.
+
+    Jobs are keyed by run and name, so a resumed coordinator re-attaches to
+    the jobs it queued before instead of queueing them again.
+    """
+    queue = get_job_queue()
+    metrics = get_run_metrics()
+    keys = {job_key(run_id, name): name for name in names}
+    queued = sum(queue.enqueue(key, {"name": name}) for key, name in keys.items())
+    print(f"\n📬 Queued {queued} jobs on {settings.EXECUTION_CONFIG['job_queue']} "
+          f"({len(keys) - queued} already queued); start workers with `python main.py --worker`")
+
+    remaining = dict(keys)
+    last_progress = 0.0
+    try:
+        while remaining:
+            for key, output in queue.results(list(remaining)).items():
+                name = remaining.pop(key)
+                if output["status"] == FAILED:
+                    record(name, None, output.get("error", "job failed"))
+                    continue
+                metrics.merge(output["metrics"])
+                if output["outcome"] == "excluded":
+                    record(name, "delete", None)
+                elif output["outcome"] == "done":
+                    record(name, Institution(**output["institution"]), None)
+                else:
+                    record(name, None, output.get("error"))
+            if time.monotonic() - last_progress >= PROGRESS_INTERVAL or not remaining:
+                print_progress(queue.progress(prefix=f"{run_id}/"), label=f"Run {run_id}")
+                last_progress = time.monotonic()
+            if remaining:
+                time.sleep(POLL_INTERVAL)
+    finally:
+        queue.close()
+
+
+def print_queue_status(run_id: str = ""):
+    """Print job counts for one run, or for the whole queue."""
+    queue = get_job_queue()
+    try:
+        print_progress(queue.progress(prefix=f"{run_id}/" if run_id else ""),
+                       label=f"Run {run_id}" if run_id else settings.EXECUTION_CONFIG['job_queue'])
+    finally:
+        queue.close()
@@ -5,26 +5,39 @@ Company research workflow orchestrator
 
 from crewai import Crew, Process
 from typing import List
-from models.data_models import Institution
-from config.settings import USER_INTERESTS, USER_PROVIDED_COMPANIES, OUTPUT_CONFIG
-from utils.utils import process_research_results, extract_json_block
-import json5 as json
-import re
-from pydantic import BaseModel, Field
-from typing import Optional, List, Dict
+from models.data_models import Institution, InstitutionResult, InstitutionBatchResult
+from config import settings
+from utils.utils import (process_research_results, find_json, latest_results_csv, load_institution_store, is_stale,
+                         PreviousResults)
+from utils.cache import print_cache_stats
+from utils.rate_limit import print_rate_limit_stats
+from utils.metrics import get_run_metrics, start_run_metrics, timed_stage
+from utils.matching import ExclusionIndex, resolve_duplicate_names, deduplicate_institutions
+from utils.journal import RunJournal, DeadLetterQueue, new_journal_path, latest_journal_path, dead_letter_path
+from utils.retry import Budget, BudgetExceeded, budget_scope
+from utils.sinks import InstitutionSink, INSTITUTION_FIELDS
+from utils.store import InstitutionStore
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import Optional, List, Dict, Tuple
 from crewai.flow.flow import Flow, listen, start
-from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 
+import asyncio
+import contextvars
 import csv
+import math
+import multiprocessing
 import os
+import queue
+import time
 from datetime import datetime
+from pathlib import Path
 
 
-from .agents import (
-    create_company_finder_agent,
-    create_company_scraper_agent,
-    create_validator_agent
-)
+from .agents import checkout_agent
+from .careers import find_careers_page
+from .tools import split_rate_limits
+from .worker import research_via_queue
 from .tasks import (
     create_company_finding_task,
     create_similar_company_finding_task,
@@ -32,77 +45,443 @@ from .tasks import (
     create_validation_task
         )
 
+# Shards handed out per worker process in sharded runs
+SHARDS_PER_PROCESS = 4
+
+_exclusion_indexes = {}
+
+
+def get_exclusion_index() -> ExclusionIndex:
+    """Return the exclusion index built from the configured excluded companies and aliases."""
+    key = settings.config_file()
+    if key not in _exclusion_indexes:
+        _exclusion_indexes[key] = ExclusionIndex(settings.USER_PROVIDED_COMPANIES_NO,
+                                                 aliases=settings.EXCLUSION_CONFIG['aliases'],
+                                                 threshold=settings.EXCLUSION_CONFIG['fuzzy_threshold'])
+    return _exclusion_indexes[key]
+
+
+def in_current_context(fn):
+    """Wrap ``fn`` so worker threads run it in a copy of the caller's context (configuration, budgets)."""
+    context = contextvars.copy_context()
+    return lambda *args: context.copy().run(fn, *args)
+
+
 # Define our models for structured data
 class CompanyState(BaseModel):
     names: list = []
     details: list[Institution] = [] 
-
-class Institution(BaseModel):
-    """Model for institutional data"""
-    name: str
-    type: str  # 'university', 'company', 'startup', 'research_institute', 'government', 'ngo'
-    website_url: str
-    careers_url: str
-    location: Optional[str] = None
-    size: Optional[str] = None  # 'small', 'medium', 'large', 'enterprise'
-    industry: Optional[str] = None
-    interest_match: Optional[str] = None  # Which user interest this matches
-    description: Optional[str] = None
+    journal_path: str = ""
+    resume: bool = False
+    previous_results: str = ""
+    retry_names: list = []
 
 
 # Define our flow state
 
 def extract_json_array(text: str):
     """Extract first valid flat JSON array from a block of text."""
-    matches = re.findall(r'\[\s*(".*?"\s*(,\s*".*?")*)?\s*\]', text, re.DOTALL)
-    for match in re.finditer(r'\[[\s\S]*?\]', text):
+    arr = find_json(text, "[", lambda value: isinstance(value, list) and all(isinstance(x, str) for x in value))
+    return arr if arr is not None else []
+
+
+def run_crew(crew: Crew, kind: str, label: str):
+    """Kick off a crew and record its wall time and token usage in the run metrics."""
+    start = time.perf_counter()
+    result = crew.kickoff()
+    get_run_metrics().record_crew(kind, label, time.perf_counter() - start, getattr(result, "token_usage", None))
+    return result
+
+
+def discover_companies_for_interest(interest: str) -> List[str]:
+    """Run the discovery crew for one interest and return the names it found."""
+    print(f"\n🔍 Finding companies related to: {interest}")
+    with checkout_agent("finder") as agent_discovery:
+        task1 = create_company_finding_task(agent_discovery, interest)
+
+        # task2 = create_extend_company_finding_task(agent_discovery, interest)
+        # task2.context = [task1]
+        company_finder_crew = Crew(
+            agents=[agent_discovery],
+            tasks=[task1],
+            process=Process.sequential,
+            verbose=settings.OUTPUT_CONFIG['verbose']
+        )
+
+        result = run_crew(company_finder_crew, "discovery", interest)
+
+    # Extract JSON safely (flat list of names)
+    raw_json = extract_json_array(str(result))  # Use improved helper from before
+    if raw_json:
+        print(f"Found {len(raw_json)} companies for {interest}")
+    return raw_json
+
+
+def parse_company_details(name: str, text: str):
+    """
+    Parse the free-text output of the detail + validation crew.
+
+    Returns an Institution, "delete" for excluded companies, or None.
+    """
+    parsed = find_json(text)
+    print(parsed)
+    if parsed is None:
+        if text.strip().strip('`"\' ').lower() == "delete":
+            parsed = "delete"
+        else:
+            raise ValueError("No valid JSON block found in the output.")
+
+    if parsed == "delete":
+        print(f"🗑 Skipped and removed excluded company: {name}")
+        return "delete"
+
+    if isinstance(parsed, list) and len(parsed) == 1 and isinstance(parsed[0], dict):
+        print(f"Wrapped in list — unpacking single institution for: {name}")
+        parsed = parsed[0]
+
+    if isinstance(parsed, dict):
+        return Institution(**parsed)
+
+    print(f"Unexpected format for {name}: {parsed}")
+    return None
+
+
+def research_company_details(name: str):
+    """Run the detail + validation crew for a single company.
+
+    Returns an Institution, the string "delete" for excluded companies,
+    or None when the output could not be parsed. Each call checks out its
+    own agent from the pool so it can safely run in a worker thread.
+
+    With CAREERS_FAST_PATH the likely website and careers page are looked
+    up first without the LLM and handed to the agent as a starting point.
+    """
+    structured = settings.LLM_CONFIG['structured_output']
+    print(f"\n🔍 Finding details for: {name}")
+    known = find_careers_page(name) if settings.EXECUTION_CONFIG['careers_fast_path'] else {}
+    with checkout_agent("scraper") as agent_detail_finder:
+        task1 = create_company_detail_finding_task(agent_detail_finder, name, structured=structured, known=known)
+        task2 = create_validation_task(agent_detail_finder, task1, structured=structured)
+        company_detail_finder_crew = Crew(
+            agents=[agent_detail_finder],
+            tasks=[task1, task2],
+            process=Process.sequential,
+            verbose=settings.OUTPUT_CONFIG['verbose']
+        )
+
+        result = run_crew(company_detail_finder_crew, "detail", name)
+
+    try:
+        # Typed results skip text parsing; fall back to it if the conversion failed
+        if isinstance(result.pydantic, InstitutionResult):
+            if result.pydantic.excluded:
+                print(f"🗑 Skipped and removed excluded company: {name}")
+                return "delete"
+            institution = result.pydantic.institution
+        else:
+            institution = parse_company_details(name, str(result))
+
+        if isinstance(institution, Institution):
+            institution.last_updated = datetime.now().isoformat(timespec="seconds")
+            return institution
+        if institution == "delete":
+            return "delete"
+        print(f"❌ No institution details returned for {name}")
+
+    except Exception as e:
+        print(f"❌ Error processing {name}: {e}")
+
+    return None
+
+
+def research_company_batch(names: List[str]) -> Dict[str, object]:
+    """Run one detail + validation crew covering several companies.
+
+    Returns a dict mapping each name the crew answered for to an Institution
+    or "delete". Names that are missing or invalid in the output are left out
+    so the caller can fall back to per-company research for them.
+    """
+    structured = settings.LLM_CONFIG['structured_output']
+    print(f"\n🔍 Finding details for {len(names)} companies: {', '.join(names)}")
+    known = {}
+    if settings.EXECUTION_CONFIG['careers_fast_path']:
+        with ThreadPoolExecutor(max_workers=len(names)) as executor:
+            known = dict(zip(names, executor.map(in_current_context(find_careers_page), names)))
+    with checkout_agent("scraper") as agent_detail_finder:
+        task1 = create_company_detail_finding_task(agent_detail_finder, names, structured=structured, known=known)
+        task2 = create_validation_task(agent_detail_finder, task1, structured=structured, batch=True)
+        company_detail_finder_crew = Crew(
+            agents=[agent_detail_finder],
+            tasks=[task1, task2],
+            process=Process.sequential,
+            verbose=settings.OUTPUT_CONFIG['verbose']
+        )
+
+        result = run_crew(company_detail_finder_crew, "detail_batch", ", ".join(names))
+
+    if isinstance(result.pydantic, InstitutionBatchResult):
+        items = [
+            {"query": item.query, "excluded": item.excluded, **(item.institution.model_dump() if item.institution else {})}
+            for item in result.pydantic.results
+        ]
+    else:
+        items = find_json(str(result), "[", lambda value: all(isinstance(x, dict) for x in value)) or []
+
+    by_key = {name.strip().lower(): name for name in names}
+    outcomes = {}
+    timestamp = datetime.now().isoformat(timespec="seconds")
+    for item in items:
+        item = dict(item)
+        query = str(item.pop("query", None) or "").strip().lower()
+        name = by_key.get(query) or by_key.get(str(item.get("name", "")).strip().lower())
+        if name is None or name in outcomes:
+            continue
+        if item.pop("excluded", False):
+            print(f"🗑 Skipped and removed excluded company: {name}")
+            outcomes[name] = "delete"
+            continue
         try:
-            arr = json.loads(match.group())
-            if isinstance(arr, list) and all(isinstance(x, str) for x in arr):
-                return arr
-        except:
+            institution = Institution(**item)
+        except Exception as e:
+            print(f"❌ Invalid details for {name} in batch: {e}")
             continue
-    return []
+        institution.last_updated = timestamp
+        outcomes[name] = institution
+
+    missing = [name for name in names if name not in outcomes]
+    if missing:
+        print(f"↩️ Batch returned nothing usable for {', '.join(missing)}; researching them one by one")
+    return outcomes
+
+
+def checkpointed_outcomes(journal: RunJournal) -> Dict[str, object]:
+    """Return the outcomes an interrupted run already journaled: Institutions and "delete" for excluded companies."""
+    results = {}
+    for name, event in journal.load()["results"].items():
+        if event["status"] == "done":
+            results[name] = Institution(**event["institution"])
+        elif event["status"] == "excluded":
+            results[name] = "delete"
+    return results
+
+
+def fresh_record(store: PreviousResults, name: str) -> Optional[Institution]:
+    """Return the previous record of ``name`` if it is younger than REFRESH_MAX_AGE_DAYS."""
+    known = store.get(name)
+    if known is None or is_stale(known, settings.EXECUTION_CONFIG['refresh_max_age_days']):
+        return None
+    return known
+
+
+class ResultRecorder:
+    """
+    Checkpoint and publish company outcomes as they come in.
+
+    Each outcome (an Institution, "delete" or None) is written to the run
+    journal and metrics, failures are added to the dead-letter list and
+    recovered companies removed from it, and the outcome is passed on to
+    ``publish``. Safe to call from worker threads.
+    """
+
+    def __init__(self, journal: RunJournal, publish):
+        self.journal = journal
+        self.publish = publish
+        self.dead_letters = DeadLetterQueue(dead_letter_path(settings.EXECUTION_CONFIG['checkpoint_dir']))
+        self.previously_failed = set(self.dead_letters.names())
+        self.results: Dict[str, object] = {}
+
+    def __call__(self, name: str, result, error: Optional[str] = None):
+        metrics = get_run_metrics()
+        if result == "delete":
+            self.journal.record_result(name, "excluded")
+            metrics.set_status(name, "excluded")
+        elif result is None:
+            self.journal.record_result(name, "failed")
+            metrics.set_status(name, "failed")
+            self.dead_letters.add(name, error)
+        else:
+            self.journal.record_result(name, "done", result.model_dump())
+            metrics.set_status(name, "done")
+            metrics.mark("first_result")
+        if result is not None and name in self.previously_failed:
+            self.dead_letters.remove(name)
+        self.publish(name, result)
+        self.results[name] = result
+
+
+def split_batches(names: List[str], batch_size: int) -> List[List[str]]:
+    """Split ``names`` into consecutive batches of at most ``batch_size``."""
+    return [names[i:i + batch_size] for i in range(0, len(names), batch_size)]
+
+
+def research_batch(batch: List[str]) -> List[Tuple[str, object, str]]:
+    """
+    Research a batch of companies, each under its own time/token budget.
+
+    Batches of several companies first go through one shared crew; names it
+    does not answer for are researched one by one. Returns (name, result,
+    error) for every name, where result is an Institution, "delete" or None.
+    """
+    metrics = get_run_metrics()
+
+    def with_budget(fn, arg, names):
+        # Each company gets its own time/token allowance; a batch gets one per company
+        budget = Budget(seconds=settings.EXECUTION_CONFIG['company_timeout_seconds'] * len(names),
+                        tokens=settings.EXECUTION_CONFIG['company_token_budget'] * len(names))
+        with budget_scope(budget), metrics.company(names):
+            return fn(arg)
+
+    outcomes = {}
+    if len(batch) > 1:
+        try:
+            outcomes = with_budget(research_company_batch, batch, batch)
+        except Exception as e:
+            print(f"❌ Batch failed, researching companies one by one: {e}")
 
+    batch_results = []
+    for name in batch:
+        error = "no usable details in the crew output"
+        try:
+            result = outcomes[name] if name in outcomes else with_budget(research_company_details, name, [name])
+        except BudgetExceeded as e:
+            print(f"⏱ Giving up on {name}: {e}")
+            result, error = None, str(e)
+        except Exception as e:
+            print(f"❌ Research failed for {name}: {e}")
+            result, error = None, f"{type(e).__name__}: {e}"
+        batch_results.append((name, result, error))
+    return batch_results
+
+
+def research_shard(config_file: str, names: List[str], shard_processes: int, outbox) -> Dict[str, object]:
+    """
+    Research ``names`` in a worker process of a sharded run.
+
+    The worker loads ``config_file``, takes its share of every provider's rate
+    limit and researches the names with MAX_WORKERS threads and its own tool
+    clients. Picklable (name, result, error) outcomes, institutions as dicts,
+    are put on ``outbox`` as each batch finishes; the worker's metrics report
+    is returned for the coordinator to merge.
+    """
+    settings.set_config_file(config_file)
+    split_rate_limits(shard_processes)
+    metrics = start_run_metrics(settings.COST_CONFIG)
+
+    batches = split_batches(names, settings.EXECUTION_CONFIG['detail_batch_size'])
+    with ThreadPoolExecutor(max_workers=min(settings.EXECUTION_CONFIG['max_workers'], len(batches))) as executor:
+        for future in as_completed([executor.submit(research_batch, batch) for batch in batches]):
+            for name, result, error in future.result():
+                outbox.put((name, result.model_dump() if isinstance(result, Institution) else result, error))
+    return {"metrics": metrics.report()}
+
+
+def research_sharded(names: List[str], processes: int, record):
+    """
+    Partition ``names`` over worker processes and ``record`` every outcome as soon as it arrives.
+
+    Workers send each batch's outcomes back over a queue, so results are
+    journaled while their shard is still running. Shards are a few times
+    smaller than names/processes so one slow shard does not hold up a whole
+    process. The coordinator (this process) stays the only writer of the
+    journal, the dead-letter list and the sinks; duplicates across shards are
+    merged by the deduplication step.
+    """
+    batch_size = settings.EXECUTION_CONFIG['detail_batch_size']
+    shard_size = max(batch_size, math.ceil(len(names) / (processes * SHARDS_PER_PROCESS)))
+    shards = split_batches(names, shard_size)
+    processes = min(processes, len(shards))
+    print(f"\n🧩 Researching {len(names)} institutions in {len(shards)} shards with {processes} processes "
+          f"x {settings.EXECUTION_CONFIG['max_workers']} workers")
+
+    config_file = str(Path(settings.config_file()).resolve())
+    metrics = get_run_metrics()
+    unrecorded = set(names)
+
+    def receive(outbox, timeout: Optional[float] = None) -> bool:
+        try:
+            name, result, error = outbox.get(timeout=timeout) if timeout else outbox.get_nowait()
+        except queue.Empty:
+            return False
+        unrecorded.discard(name)
+        record(name, Institution(**result) if isinstance(result, dict) else result, error)
+        return True
+
+    # Fresh interpreters rather than forks of a process that already runs threads
+    context = multiprocessing.get_context("spawn")
+    with context.Manager() as manager:
+        outbox = manager.Queue()
+        executor = ProcessPoolExecutor(max_workers=processes, mp_context=context)
+        try:
+            futures = {executor.submit(research_shard, config_file, shard, processes, outbox): shard for shard in shards}
+            running = set(futures)
+            while running:
+                if receive(outbox, timeout=0.5):
+                    continue
+                finished = [future for future in running if future.done()]
+                # A finished shard has queued all its outcomes; take them before judging it
+                while receive(outbox):
+                    pass
+                for future in finished:
+                    running.discard(future)
+                    shard = futures[future]
+                    try:
+                        metrics.merge(future.result()["metrics"])
+                    except Exception as e:
+                        print(f"❌ Shard of {len(shard)} institutions failed: {e}")
+                        for name in shard:
+                            if name in unrecorded:
+                                unrecorded.discard(name)
+                                record(name, None, f"{type(e).__name__}: {e}")
+        except BaseException:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        executor.shutdown()
 
 
 class CompanyFinderFlow(Flow[CompanyState]):
     """Flow for creating a comprehensive guide on any topic"""
 
-    @start()
-    def run_company_discovery(self):
-        agent_discovery = create_company_finder_agent()
-
-        all_names = []
-
-        if  USER_PROVIDED_COMPANIES:
-            all_names.extend(USER_PROVIDED_COMPANIES)
+    # Callables notified with (name, result) as soon as each company is finished
+    _result_listeners: list = PrivateAttr(default_factory=list)
 
+    def subscribe(self, listener):
+        """Register a listener called with (name, result) for every completed company."""
+        self._result_listeners.append(listener)
 
-        for interest in USER_INTERESTS:
-            print(f"\n🔍 Finding companies related to: {interest}")
-            task1 = create_company_finding_task(agent_discovery, interest)
+    def _publish(self, name: str, result):
+        for listener in self._result_listeners:
+            listener(name, result)
 
-            # task2 = create_extend_company_finding_task(agent_discovery, interest)
-            # task2.context = [task1]
-            company_finder_crew = Crew(
-                agents=[agent_discovery],
-                tasks=[task1],
-                process=Process.sequential,
-                verbose=OUTPUT_CONFIG['verbose']
-            )
+    @start()
+    @timed_stage
+    def run_company_discovery(self):
+        journal = RunJournal(self.state.journal_path)
+        if self.state.resume:
+            checkpoint = journal.load()
+            if checkpoint["names"] is not None:
+                self.state.names = checkpoint["names"]
+                print(f"\n♻️ Resuming {journal.path}: reusing {len(self.state.names)} discovered institutions")
+                return self.state
+
+        if self.state.retry_names:
+            self.state.names = list(self.state.retry_names)
+            journal.record_names(self.state.names)
+            print(f"\n🔁 Retrying {len(self.state.names)} institutions from the dead-letter list")
+            return self.state
 
-            result = company_finder_crew.kickoff()
+        all_names = []
 
-            # Extract JSON safely (flat list of names)
-            raw_json = extract_json_array(str(result))  # Use improved helper from before
-            if not raw_json:
-                continue
+        if  settings.USER_PROVIDED_COMPANIES:
+            all_names.extend(settings.USER_PROVIDED_COMPANIES)
 
-            print(f"Found {len(raw_json)} companies for {interest}")
-            all_names.extend(raw_json)
+        # Interest searches are independent, so run them side by side and
+        # merge in USER_INTERESTS order to keep the result deterministic
+        max_workers = min(settings.EXECUTION_CONFIG['max_discovery_workers'], max(len(settings.USER_INTERESTS), 1))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for names in executor.map(in_current_context(discover_companies_for_interest), settings.USER_INTERESTS):
+                all_names.extend(names)
 
-        # for company in USER_PROVIDED_COMPANIES:
+        # for company in settings.USER_PROVIDED_COMPANIES:
         #     print(f"\n🔍 Finding companies similar to: {company}")
         #     task1 = create_similar_company_finding_task(agent_discovery, company)
 
@@ -112,7 +491,7 @@ class CompanyFinderFlow(Flow[CompanyState]):
         #         agents=[agent_discovery],
         #         tasks=[task1],
         #         process=Process.sequential,
-        #         verbose=OUTPUT_CONFIG['verbose']
+        #         verbose=settings.OUTPUT_CONFIG['verbose']
         #     )
 
         #     result = company_finder_crew.kickoff()
@@ -125,120 +504,142 @@ class CompanyFinderFlow(Flow[CompanyState]):
         #     print(f"Found {len(raw_json)} companies similar to {company}")
         #     all_names.extend(raw_json)
 
-        # Deduplicate while preserving order
-        deduplicated_names = list(OrderedDict.fromkeys(all_names))
-        self.state.names = deduplicated_names
+        # Merge spelling variants ("TU Delft", "Delft University of Technology") before
+        # paying for a detail crew per variant; the first spelling seen is kept
+        deduplicated_names, duplicates = resolve_duplicate_names(
+            all_names, threshold=settings.EXECUTION_CONFIG['name_match_threshold'])
+        for variant, kept_name in duplicates.items():
+            print(f"🔗 Merging {variant} into {kept_name}")
+
+        # Drop excluded companies here rather than paying for a detail crew to answer "delete";
+        # companies the user asked for explicitly are always kept
+        exclusion_index = get_exclusion_index()
+        kept_names = []
+        for name in deduplicated_names:
+            match = exclusion_index.match(name) if name not in settings.USER_PROVIDED_COMPANIES else None
+            if match:
+                print(f"🚫 Skipping {name} (excluded: {match})")
+            else:
+                kept_names.append(name)
+
+        self.state.names = kept_names
+        journal.record_names(self.state.names)
 
         print(f"\n📦 Total unique institutions found: {len(self.state.names)}")
         return self.state
 
 
     @listen(run_company_discovery)
+    @timed_stage
     def get_company_details(self, outline):
-        """Find necessary details about a company"""
-        agent_detail_finder = create_company_scraper_agent()
-
-        for name in self.state.names:
-            print(f"\n🔍 Finding details for: {name}")
-            task1 = create_company_detail_finding_task(agent_detail_finder, name)
-
-            task2 = create_validation_task(agent_detail_finder, task1)
-            # task2.context = [task1]
-            company_detail_finder_crew = Crew(
-                agents=[agent_detail_finder],
-                tasks=[task1, task2],
-                process=Process.sequential,
-                verbose=OUTPUT_CONFIG['verbose']
-            )
-
-            result = company_detail_finder_crew.kickoff()
-
-            raw_json = extract_json_block(str(result))
-            print(raw_json)
-            # parsed = json.loads(raw_json)
-            # print(parsed)
+        """Find necessary details about every company, several at a time"""
+        names = list(self.state.names)
+        journal = RunJournal(self.state.journal_path)
+
+        # Outcomes already checkpointed by an interrupted run; failed companies are retried
+        results = checkpointed_outcomes(journal) if self.state.resume else {}
+
+        # In incremental mode, reuse previous records that are still fresh
+        if self.state.previous_results:
+            store = load_institution_store(self.state.previous_results,
+                                           settings.EXECUTION_CONFIG['name_match_threshold'])
+            reused = 0
+            for name in names:
+                known = fresh_record(store, name)
+                if name not in results and known is not None:
+                    results[name] = known
+                    reused += 1
+            print(f"\n♻️ Reusing {reused} up-to-date institutions from {self.state.previous_results}")
+
+        for name, result in results.items():
+            self._publish(name, result)
+
+        pending = [name for name in names if name not in results]
+        if len(pending) < len(names):
+            print(f"\n♻️ Skipping {len(names) - len(pending)} institutions already researched")
+
+        record = ResultRecorder(journal, self._publish)
+
+        def research_and_checkpoint(batch):
+            for name, result, error in research_batch(batch):
+                record(name, result, error)
+
+        batch_size = settings.EXECUTION_CONFIG['detail_batch_size']
+        shard_processes = settings.EXECUTION_CONFIG['shard_processes'] or os.cpu_count() or 1
+        if settings.EXECUTION_CONFIG['job_queue'] and pending:
+            run_id = Path(self.state.journal_path).stem
+            research_via_queue(pending, run_id, record)
+        elif shard_processes > 1 and len(pending) > batch_size:
+            research_sharded(pending, shard_processes, record)
+        else:
+            batches = split_batches(pending, batch_size)
+            max_workers = min(settings.EXECUTION_CONFIG['max_workers'], max(len(batches), 1))
+            print(f"\n⚙️ Researching {len(pending)} institutions in {len(batches)} batches with {max_workers} workers")
+
+            executor = ThreadPoolExecutor(max_workers=max_workers)
             try:
-                parsed = json.loads(raw_json)
-
-                if parsed == "delete":
-                    print(f"🗑 Skipped and removed excluded company: {name}")
-                    self.state.names.remove(name)
-                    continue
-
-                if isinstance(parsed, dict):
-                    institution = Institution(**parsed)
-                    self.state.details.append(institution)
-
-                elif isinstance(parsed, list) and len(parsed) == 1 and isinstance(parsed[0], dict):
-                    print(f"Wrapped in list — unpacking single institution for: {name}")
-                    institution = Institution(**parsed[0])
-                    self.state.details.append(institution)
-
-                else:
-                    print(f"Unexpected format for {name}: {parsed}")
-
-            except Exception as e:
-                print(f"❌ Error processing {name}: {e}")
-
+                list(executor.map(in_current_context(research_and_checkpoint), batches))
+            except BaseException:
+                # Drop queued companies on Ctrl-C or crash; those in flight still finish and get journaled
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+            executor.shutdown()
+        results.update(record.results)
+
+        # Merge in discovery order so state.details stays deterministic
+        excluded = set()
+        for name in names:
+            result = results.get(name)
+            if result == "delete":
+                excluded.add(name)
+            elif result is not None:
+                self.state.details.append(result)
+
+        failed = [name for name in pending if results.get(name) is None]
+        if failed:
+            print(f"\n📮 {len(failed)} institutions failed and were added to {record.dead_letters.path}; "
+                  f"run `python main.py --retry-failed` to try them again")
+
+        self.state.names = [name for name in names if name not in excluded]
         return self.state
     
     @listen(get_company_details)
+    @timed_stage
     def deduplicate_institutions(self):
-        """Deduplicate self.state.details based on institution name and website_url."""
+        """Merge records in self.state.details that share a website domain or canonical name."""
         print("\n🧹 Deduplicating institution details...")
 
-        seen = set()
-        unique_institutions = []
+        self.state.details, merged_count = deduplicate_institutions(self.state.details)
 
-        for inst in self.state.details:
-            key = (inst.name.strip().lower(), inst.website_url.strip().lower())
-            if key not in seen:
-                seen.add(key)
-                unique_institutions.append(inst)
-            else:
-                print(f"Duplicate removed: {inst.name} ({inst.website_url})")
-
-        original_count = len(self.state.details)
-        deduped_count = len(unique_institutions)
-
-        self.state.details = unique_institutions
-
-        print(f"Deduplication complete: {original_count - deduped_count} removed, {deduped_count} remaining.")
+        print(f"Deduplication complete: {merged_count} merged, {len(self.state.details)} remaining.")
         return self.state
 
     @listen(deduplicate_institutions)
+    @timed_stage
     def save_institutions_to_csv(self) -> str:
         """Save all institutions in self.state.details to a CSV file."""
         if not self.state.details:
             print("No institution details to save.")
             return None
 
-        # Filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"institutions_{timestamp}.csv"
-
-        # Define fieldnames based on your Institution model
-        fieldnames = [
-            "name",
-            "type",
-            "website_url",
-            "careers_url",
-            "location",
-            "size",
-            "industry",
-            "interest_match",
-            "description",
-        ]
+        return write_results_csv(self.state.details)
+
 
-        print(f"\nSaving {len(self.state.details)} institutions to {filename}...")
+def write_results_csv(institutions: List[Institution]) -> str:
+    """Write the final results to institutions_<timestamp>.csv and return the file name."""
+    # Filename with timestamp
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"institutions_{timestamp}.csv"
 
-        with open(filename, mode="w", newline="", encoding="utf-8") as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            for inst in self.state.details:
-                        writer.writerow(inst.dict())
+    print(f"\nSaving {len(institutions)} institutions to {filename}...")
 
-        return filename
+    with open(filename, mode="w", newline="", encoding="utf-8") as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=INSTITUTION_FIELDS)
+        writer.writeheader()
+        for inst in institutions:
+            writer.writerow(inst.dict())
+
+    return filename
 
 def plot():
     """Generate a visualization of the flow"""
@@ -247,24 +648,103 @@ def plot():
     print("Flow visualization saved to guide_creator_flow.html")
 
     
-def run_complete_workflow() -> str:
+def run_complete_workflow(resume: Optional[str] = None, incremental: Optional[str] = None,
+                          retry_failed: bool = False, streaming: bool = False) -> Optional[str]:
     plot()
 
     """Run the complete company research workflow."""
+    settings.print_config_summary()
     print("🎯 Starting Complete Company Research Workflow")
-    print(f"Researching interests: {', '.join(USER_INTERESTS)}")
-    if USER_PROVIDED_COMPANIES:
-        print(f"Institution similar to: {', '.join(USER_PROVIDED_COMPANIES)}")
+    print(f"Researching interests: {', '.join(settings.USER_INTERESTS)}")
+    if settings.USER_PROVIDED_COMPANIES:
+        print(f"Institution similar to: {', '.join(settings.USER_PROVIDED_COMPANIES)}")
     print("="*60)
+
+    checkpoint_dir = settings.EXECUTION_CONFIG['checkpoint_dir']
+    journal_path = None
+    if resume:
+        journal_path = latest_journal_path(checkpoint_dir) if resume == "latest" else resume
+        if not journal_path:
+            print(f"No checkpoint found in {checkpoint_dir}, starting a new run")
+    if not journal_path:
+        journal_path = new_journal_path(checkpoint_dir)
+    print(f"📝 Checkpointing progress to {journal_path}")
+
+    previous_results = None
+    if incremental:
+        previous_results = latest_results_csv() if incremental == "latest" else incremental
+        if previous_results and os.path.exists(previous_results):
+            print(f"🔁 Incremental refresh against {previous_results}")
+        else:
+            print("No previous results found, researching every institution")
+            previous_results = None
     
+    retry_names = []
+    if retry_failed:
+        retry_names = DeadLetterQueue(dead_letter_path(checkpoint_dir)).names()
+        if not retry_names:
+            print("The dead-letter list is empty, nothing to retry")
+            return None
+
+    metrics = start_run_metrics(settings.COST_CONFIG)
+    sink = None
+    if settings.OUTPUT_CONFIG['stream']:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        sink = InstitutionSink(f"institutions_{timestamp}_partial", fsync=settings.OUTPUT_CONFIG['stream_fsync'])
+        print(f"📡 Streaming results to {sink.csv_path} and {sink.jsonl_path}")
+
+    inputs = {
+        "journal_path": journal_path,
+        "resume": os.path.exists(journal_path),
+        "previous_results": previous_results or "",
+        "retry_names": retry_names
+    }
     try:
-        fname = CompanyFinderFlow().kickoff()
+        if streaming:
+            from .pipeline import run_pipeline
+            fname, details = asyncio.run(run_pipeline(publish=sink.on_result if sink else None, **inputs))
+        else:
+            flow = CompanyFinderFlow()
+            if sink:
+                flow.subscribe(sink.on_result)
+            fname = flow.kickoff(inputs=inputs)
+            details = flow.state.details
     except Exception as e:
         print(f"❌ Error in workflow: {e}")
         import traceback
         traceback.print_exc()
-        return None, None
-
-def run_company_research() -> str:
-    """Convenience function to run the complete company research workflow."""
-    return run_complete_workflow()
\ No newline at end of file
+        return None
+    finally:
+        if sink:
+            sink.close()
+        print_cache_stats()
+        print_rate_limit_stats()
+        metrics.print_summary()
+        report_path = metrics.write_report(str(Path(journal_path).with_name(
+            Path(journal_path).stem.replace("run_", "report_", 1) + ".json")))
+        print(f"📈 Run report written to {report_path}")
+
+    if settings.OUTPUT_CONFIG['store'] and details:
+        store = InstitutionStore(settings.OUTPUT_CONFIG['store_path'])
+        try:
+            store.upsert(details)
+            print(f"🗄️ Merged {len(details)} institutions into {store.path} ({len(store)} stored)")
+        finally:
+            store.close()
+
+    return fname
+
+def run_company_research(resume: Optional[str] = None, incremental: Optional[str] = None,
+                         retry_failed: bool = False, streaming: bool = False) -> Optional[str]:
+    """
+    Convenience function to run the complete company research workflow.
+
+    Pass ``resume="latest"`` or a journal path to continue an interrupted run,
+    ``incremental="latest"`` or a previous results CSV to only research
+    institutions that are new or older than REFRESH_MAX_AGE_DAYS, and
+    ``retry_failed=True`` to research only the companies on the dead-letter list.
+    ``streaming=True`` runs the asyncio pipeline, in which discovery, research
+    and output overlap, instead of the stage-by-stage flow. Returns the
+    results CSV, or None when the run failed or had nothing to do.
+    """
+    return run_complete_workflow(resume, incremental, retry_failed, streaming)
\ No newline at end of file
@@ -4,7 +4,51 @@ Main entry point for the Job Search System
 """
 
 import os
-from crews import run_company_research
+import argparse
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Job Search System")
+    parser.add_argument(
+        "--config", metavar="FILE",
+        help="Read the user configuration from FILE instead of config/user_config.txt"
+    )
+    parser.add_argument(
+        "--resume", nargs="?", const="latest", metavar="JOURNAL",
+        help="Resume an interrupted run from its checkpoint journal (default: the latest one)"
+    )
+    parser.add_argument(
+        "--incremental", nargs="?", const="latest", metavar="CSV",
+        help="Only research institutions missing from, or stale in, a previous results CSV (default: the latest one)"
+    )
+    parser.add_argument(
+        "--retry-failed", action="store_true",
+        help="Research only the companies that failed in earlier runs (the dead-letter list)"
+    )
+    parser.add_argument(
+        "--streaming", action="store_true",
+        help="Overlap discovery, research and output in an asyncio pipeline instead of running them one after another"
+    )
+    parser.add_argument(
+        "--export", metavar="FILE",
+        help="Export the shared institution store to a .csv or .parquet file instead of researching"
+    )
+    parser.add_argument(
+        "--worker", action="store_true",
+        help="Research companies queued on JOB_QUEUE by a coordinator run, until interrupted"
+    )
+    parser.add_argument(
+        "--idle-exit", type=float, metavar="SECONDS",
+        help="With --worker, stop after this many seconds without jobs"
+    )
+    parser.add_argument(
+        "--queue-status", nargs="?", const="", metavar="RUN",
+        help="Show job counts on JOB_QUEUE, for one run (journal name, e.g. run_20250101_120000) or all"
+    )
+    parser.add_argument("--interest", help="With --export, only institutions matching this interest")
+    parser.add_argument("--location", help="With --export, only institutions in this location")
+    parser.add_argument("--type", dest="institution_type", help="With --export, only institutions of this type")
+    return parser.parse_args()
 
 def setup_environment():
     """Set up environment variables and validate configuration."""
@@ -21,21 +65,55 @@ def setup_environment():
     
     return True
 
+def export_store(args):
+    """Export the shared institution store, filtered by the command line options."""
+    from config import settings
+    from utils.store import InstitutionStore, export_institutions
+
+    store_path = settings.OUTPUT_CONFIG['store_path']
+    store = InstitutionStore(store_path)
+    try:
+        institutions = store.query(interest=args.interest, location=args.location,
+                                   institution_type=args.institution_type)
+    finally:
+        store.close()
+    export_institutions(institutions, args.export)
+    print(f"Exported {len(institutions)} institutions from {store_path} to {args.export}")
+
 def main():
     """Main function to orchestrate the job search system."""
+    args = parse_args()
     print("Job Search System")
     print("="*50)
     
+    if args.config:
+        from config import settings
+        settings.set_config_file(args.config)
+    
+    if args.export:
+        export_store(args)
+        return
+    
+    if args.queue_status is not None:
+        from crews.company_research.worker import print_queue_status
+        print_queue_status(args.queue_status)
+        return
+    
     # Validate environment setup
     if not setup_environment():
         return
     
+    if args.worker:
+        from crews.company_research.worker import run_worker
+        run_worker(idle_exit=args.idle_exit)
+        return
+    
     try:
-        # Import here to trigger configuration loading
         from crews import run_company_research
         
         print("\nStarting Company Research...")
-        csv_file = run_company_research()
+        csv_file = run_company_research(resume=args.resume, incremental=args.incremental,
+                                        retry_failed=args.retry_failed, streaming=args.streaming)
         
         if csv_file:
             print(f"Results saved to: {csv_file}")
@@ -49,6 +127,7 @@ def main():
         print("\nOr manually create config/user_config.txt using the template.")
     except KeyboardInterrupt:
         print("\n\n⏹Process interrupted by user")
+        print("Progress has been checkpointed. Run `python main.py --resume` to continue.")
     except Exception as e:
         print(f"\nFatal error: {e}")
         import traceback
@@ -16,8 +16,21 @@ class Institution(BaseModel):
     location: Optional[str] = None
     size: Optional[str] = None  # 'small', 'medium', 'large', 'enterprise'
     industry: Optional[str] = None
-    interest_match: str  # Which user interest this matches
+    interest_match: Optional[str] = None  # Which user interest this matches
     description: Optional[str] = None
+    last_updated: Optional[str] = None  # ISO timestamp of the last time this record was researched
+
+
+class InstitutionResult(BaseModel):
+    """Structured output of the detail and validation tasks"""
+    query: Optional[str] = None  # Company name exactly as given in the task (batched tasks)
+    excluded: bool = False  # True when the company is on the user's exclusion list
+    institution: Optional[Institution] = None  # Filled in unless excluded
+
+
+class InstitutionBatchResult(BaseModel):
+    """Structured output of batched detail and validation tasks"""
+    results: List[InstitutionResult] = []
 
 
 class InstitutionBase(BaseModel):
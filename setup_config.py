@@ -63,6 +63,7 @@ def create_user_config_interactive():
     companies_exclude = input("Companies to exclude (comma-separated, optional): ").strip()
     if companies_exclude:
         config_lines.append(f"COMPANIES_TO_EXCLUDE={companies_exclude}")
+        config_lines.append("EXCLUSION_FUZZY_THRESHOLD=0.88")
     
     # Add default settings
     config_lines.extend([
@@ -72,10 +73,61 @@ def create_user_config_interactive():
         "SEARCH_LOCATION=Europe",
         "SEARCH_LOCALE=en-GB",
         "MAX_RESULTS_PER_SEARCH=10",
+        "SERPER_BASE_URL=https://google.serper.dev",
+        "FIRECRAWL_API_URL=https://api.firecrawl.dev",
         "",
         "# OUTPUT PREFERENCES",
         "OUTPUT_FILENAME=my_job_research_results.csv",
-        "VERBOSE_OUTPUT=false"
+        "VERBOSE_OUTPUT=false",
+        "STREAM_OUTPUT=true",
+        "STREAM_FSYNC=false",
+        "STORE_RESULTS=true",
+        "STORE_PATH=institutions.db",
+        "",
+        "# PERFORMANCE",
+        "MAX_WORKERS=4",
+        "MAX_DISCOVERY_WORKERS=4",
+        "DETAIL_BATCH_SIZE=1",
+        "CAREERS_FAST_PATH=true",
+        "CAREERS_PATHS=/careers, /jobs, /werken-bij, /vacancies",
+        "SHARD_PROCESSES=1",
+        "JOB_QUEUE=",
+        "JOB_VISIBILITY_TIMEOUT_SECONDS=900",
+        "JOB_WORKERS=1",
+        "NAME_MATCH_THRESHOLD=0.9",
+        "CHECKPOINT_DIR=checkpoints",
+        "REFRESH_MAX_AGE_DAYS=30",
+        "COMPANY_TIMEOUT_SECONDS=600",
+        "COMPANY_TOKEN_BUDGET=200000",
+        "MAX_RETRIES=3",
+        "RETRY_BASE_DELAY_SECONDS=2",
+        "",
+        "# LLM",
+        "LLM_MODEL=gpt-4o-mini",
+        "LLM_CACHE=on",
+        "LLM_TIMEOUT_SECONDS=120",
+        "STRUCTURED_OUTPUT=false",
+        "",
+        "# CACHING",
+        "CACHE_DIR=.cache",
+        "SEARCH_CACHE_TTL_HOURS=168",
+        "SEARCH_CACHE_MAX_ENTRIES=5000",
+        "SCRAPE_CACHE_MAX_AGE_HOURS=72",
+        "SCRAPE_CACHE_MAX_ENTRIES=2000",
+        "",
+        "# RATE LIMITS",
+        "SERPER_REQUESTS_PER_MINUTE=300",
+        "SERPER_MAX_CONCURRENCY=5",
+        "FIRECRAWL_REQUESTS_PER_MINUTE=100",
+        "FIRECRAWL_MAX_CONCURRENCY=4",
+        "LLM_REQUESTS_PER_MINUTE=500",
+        "LLM_MAX_CONCURRENCY=8",
+        "",
+        "# COSTS",
+        "LLM_INPUT_COST_PER_MTOK=0.15",
+        "LLM_OUTPUT_COST_PER_MTOK=0.60",
+        "SERPER_COST_PER_1K=1.0",
+        "FIRECRAWL_COST_PER_1K=5.0"
     ])
     
     # Write configuration file
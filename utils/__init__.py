@@ -5,16 +5,58 @@ Utility functions for the Job Search System
 
 from .utils import (
     extract_json_block,
+    find_json,
+    locate_json_spans,
     save_institutions_to_csv,
     load_institutions_from_csv,
+    latest_results_csv,
+    load_institution_store,
+    PreviousResults,
+    is_stale,
     print_research_summary,
     process_research_results
 )
+from .cache import DiskCache, get_cache, print_cache_stats
+from .matching import (
+    ExclusionIndex,
+    normalize_name,
+    resolve_duplicate_names,
+    merge_institutions,
+    deduplicate_institutions
+)
+from .urls import canonicalize_url, registrable_domain
+from .store import InstitutionStore, export_institutions
+from .jobs import JobQueue, SQLiteJobQueue, RedisJobQueue, open_job_queue
+from .pool import ObjectPool, get_http_session
 
 __all__ = [
     'extract_json_block',
+    'find_json',
+    'locate_json_spans',
     'save_institutions_to_csv', 
     'load_institutions_from_csv',
+    'latest_results_csv',
+    'load_institution_store',
+    'PreviousResults',
+    'is_stale',
     'print_research_summary',
-    'process_research_results'
+    'process_research_results',
+    'DiskCache',
+    'get_cache',
+    'print_cache_stats',
+    'ExclusionIndex',
+    'normalize_name',
+    'resolve_duplicate_names',
+    'merge_institutions',
+    'deduplicate_institutions',
+    'canonicalize_url',
+    'registrable_domain',
+    'InstitutionStore',
+    'export_institutions',
+    'JobQueue',
+    'SQLiteJobQueue',
+    'RedisJobQueue',
+    'open_job_queue',
+    'ObjectPool',
+    'get_http_session'
 ]
\ No newline at end of file
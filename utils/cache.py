@@ -0,0 +1,209 @@
+# utils/cache.py
+"""
+Persistent on-disk caches backed by SQLite
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+
+_caches: Dict[Tuple[str, str], "DiskCache"] = {}
+_registry_lock = threading.Lock()
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a free-text query so trivially different spellings share a cache entry."""
+    return " ".join(str(query).lower().split())
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Build a stable cache key from JSON-serializable parts."""
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """
+    Key/value cache stored in a SQLite file.
+
+    Values are JSON-encoded (optionally zlib-compressed). Entries older than
+    ``ttl_seconds`` are treated as misses, and once the cache holds more than
+    ``max_entries`` rows the least recently used ones are evicted. SQLite runs
+    in WAL mode, so a cache file can be shared by threads and processes, and
+    ``lock`` lets them agree on who computes a missing entry.
+    """
+
+    def __init__(self, path: str, ttl_seconds: Optional[float] = None,
+                 max_entries: Optional[int] = None, compress: bool = False):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.compress = compress
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " value BLOB NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS leases ("
+                " key TEXT PRIMARY KEY,"
+                " owner TEXT NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return the calling thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _encode(self, value: Any) -> bytes:
+        data = json.dumps(value, default=str, ensure_ascii=False).encode("utf-8")
+        return zlib.compress(data) if self.compress else data
+
+    def _decode(self, blob: bytes) -> Any:
+        data = zlib.decompress(blob) if self.compress else blob
+        return json.loads(data)
+
+    def record(self, hit: bool):
+        """Count a hit or a miss for callers that look entries up with ``get_entry``."""
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Return ``(value, created_at)`` for a key regardless of TTL, or None."""
+        conn = self._connect()
+        row = conn.execute("SELECT value, created_at FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        with conn:
+            conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+        return self._decode(row[0]), row[1]
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None on a miss or an expired entry."""
+        entry = self.get_entry(key)
+        if entry is None or (self.ttl_seconds is not None and time.time() - entry[1] > self.ttl_seconds):
+            self.record(hit=False)
+            return None
+        self.record(hit=True)
+        return entry[0]
+
+    def set(self, key: str, value: Any):
+        """Store a value and evict the least recently used entries if the cache is full."""
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, self._encode(value), now, now)
+            )
+            if self.max_entries:
+                conn.execute(
+                    "DELETE FROM entries WHERE key IN ("
+                    " SELECT key FROM entries ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+
+    def touch(self, key: str):
+        """Mark an entry as freshly fetched without rewriting its value."""
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute("UPDATE entries SET created_at = ?, last_access = ? WHERE key = ?", (now, now, key))
+
+    def _try_lease(self, key: str, owner: str, lease_seconds: float) -> bool:
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM leases WHERE key = ? AND expires_at < ?", (key, now))
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO leases (key, owner, expires_at) VALUES (?, ?, ?)",
+                (key, owner, now + lease_seconds)
+            )
+        return cursor.rowcount == 1
+
+    @contextmanager
+    def lock(self, key: str, lease_seconds: float = 300, poll_interval: float = 0.5):
+        """
+        Hold an exclusive lock on a key across threads and processes.
+
+        Threads of this process serialize on an in-memory lock; other processes
+        sharing the file wait on a lease row that expires after ``lease_seconds``
+        in case its holder died. Callers should re-check the cache once inside.
+        """
+        with self._stats_lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            owner = f"{os.getpid()}:{threading.get_ident()}"
+            while not self._try_lease(key, owner, lease_seconds):
+                time.sleep(poll_interval)
+            try:
+                yield
+            finally:
+                conn = self._connect()
+                with conn:
+                    conn.execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, owner))
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+
+def get_cache(name: str, cache_dir: str, **kwargs) -> DiskCache:
+    """Return the named cache, creating ``<cache_dir>/<name>.sqlite`` on first use."""
+    path = os.path.abspath(os.path.join(cache_dir, f"{name}.sqlite"))
+    with _registry_lock:
+        if (name, path) not in _caches:
+            _caches[name, path] = DiskCache(path, **kwargs)
+        return _caches[name, path]
+
+
+def get_cache_stats() -> Dict[str, Dict[str, int]]:
+    """Return hit/miss counters for every cache opened in this process."""
+    stats: Dict[str, Dict[str, int]] = {}
+    with _registry_lock:
+        for (name, _), cache in _caches.items():
+            counters = stats.setdefault(name, {"hits": 0, "misses": 0})
+            counters["hits"] += cache.hits
+            counters["misses"] += cache.misses
+    return stats
+
+
+def print_cache_stats():
+    """Print hit/miss counters for every cache opened in this process."""
+    stats = get_cache_stats()
+    if not stats:
+        return
+    print("\n💾 Cache statistics:")
+    for name, counters in stats.items():
+        total = counters["hits"] + counters["misses"]
+        rate = (counters["hits"] / total * 100) if total else 0.0
+        print(f"  {name}: {counters['hits']} hits, {counters['misses']} misses ({rate:.0f}% hit rate)")
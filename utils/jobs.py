@@ -0,0 +1,329 @@
+# utils/jobs.py
+"""
+Job queues for spreading company research over several worker machines
+"""
+
+import json
+from abc import ABC, abstractmethod
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+FINAL_STATUSES = (DONE, FAILED)
+
+# Ready jobs inspected per claim attempt on Redis
+CLAIM_SCAN = 50
+
+
+@dataclass
+class Job:
+    """A job handed to a worker; ``token`` identifies this lease of it."""
+    key: str
+    payload: Dict[str, Any]
+    attempts: int
+    token: str
+
+
+class JobQueue(ABC):
+    """
+    Queue of research jobs with idempotent keys and visibility timeouts.
+
+    ``enqueue`` ignores keys that are already known, so a coordinator can
+    safely enqueue the same run again (e.g. after a restart). A claimed job
+    is invisible to other workers for ``visibility_timeout`` seconds; if its
+    worker dies without completing it, the job becomes claimable again. Jobs
+    claimed more than ``max_attempts`` times are failed instead. The first
+    ``complete`` of a job wins, so a late duplicate result is dropped.
+    """
+
+    def __init__(self, visibility_timeout: float = 900, max_attempts: int = 3):
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+
+    @abstractmethod
+    def enqueue(self, key: str, payload: Dict[str, Any]) -> bool:
+        """Add a job; returns False if ``key`` was already enqueued."""
+
+    @abstractmethod
+    def claim(self, worker: str) -> Optional[Job]:
+        """Lease the oldest visible job to ``worker``, or return None if there is none."""
+
+    @abstractmethod
+    def complete(self, job: Job, result: Dict[str, Any], status: str = DONE) -> bool:
+        """Store the result of a job; returns False if it was already finished."""
+
+    @abstractmethod
+    def release(self, job: Job):
+        """Give a claimed job back, e.g. when a worker shuts down before running it."""
+
+    @abstractmethod
+    def results(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Return ``{key: {"status": ..., **result}}`` for the finished jobs among ``keys``."""
+
+    @abstractmethod
+    def progress(self, prefix: str = "") -> Dict[str, int]:
+        """Count the jobs whose key starts with ``prefix`` per status."""
+
+    def close(self):
+        pass
+
+    def _give_up_error(self, attempts: int) -> Dict[str, Any]:
+        return {"error": f"gave up after {attempts - 1} attempts (worker lost or timed out)"}
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    token TEXT,
+    worker TEXT,
+    visible_at REAL NOT NULL,
+    result TEXT,
+    enqueued_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs(status, visible_at);
+"""
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    Job queue in a SQLite file, for workers on one machine or a shared volume.
+
+    Claims run in an immediate transaction, so concurrent workers in any
+    number of processes never lease the same job twice.
+    """
+
+    def __init__(self, path: str, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.path = Path(path)
+        if self.path.parent != Path('.'):
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def enqueue(self, key: str, payload: Dict[str, Any]) -> bool:
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO jobs (key, payload, status, visible_at, enqueued_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, json.dumps(payload), PENDING, now, now, now)
+            )
+            return cursor.rowcount == 1
+
+    def claim(self, worker: str) -> Optional[Job]:
+        while True:
+            now = time.time()
+            with self._lock:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    row = self._conn.execute(
+                        "SELECT * FROM jobs WHERE status IN (?, ?) AND visible_at <= ? ORDER BY enqueued_at LIMIT 1",
+                        (PENDING, LEASED, now)
+                    ).fetchone()
+                    if row is None:
+                        self._conn.execute("COMMIT")
+                        return None
+                    attempts = row["attempts"] + 1
+                    if attempts > self.max_attempts:
+                        self._conn.execute(
+                            "UPDATE jobs SET status = ?, result = ?, updated_at = ? WHERE key = ?",
+                            (FAILED, json.dumps(self._give_up_error(attempts)), now, row["key"])
+                        )
+                        self._conn.execute("COMMIT")
+                        continue
+                    token = uuid.uuid4().hex
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, attempts = ?, token = ?, worker = ?, visible_at = ?, updated_at = ? "
+                        "WHERE key = ?",
+                        (LEASED, attempts, token, worker, now + self.visibility_timeout, now, row["key"])
+                    )
+                    self._conn.execute("COMMIT")
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            return Job(row["key"], json.loads(row["payload"]), attempts, token)
+
+    def complete(self, job: Job, result: Dict[str, Any], status: str = DONE) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, updated_at = ? WHERE key = ? AND status NOT IN (?, ?)",
+                (status, json.dumps(result), time.time(), job.key, *FINAL_STATUSES)
+            )
+            return cursor.rowcount == 1
+
+    def release(self, job: Job):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts - 1, visible_at = ?, updated_at = ? "
+                "WHERE key = ? AND token = ? AND status = ?",
+                (PENDING, time.time(), time.time(), job.key, job.token, LEASED)
+            )
+
+    def results(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        keys = list(keys)
+        finished = {}
+        with self._lock:
+            # Stay below SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, status, result FROM jobs WHERE status IN (?, ?) "
+                    f"AND key IN ({', '.join('?' * len(chunk))})",
+                    (*FINAL_STATUSES, *chunk)
+                ).fetchall()
+                for row in rows:
+                    finished[row["key"]] = {"status": row["status"], **json.loads(row["result"] or "{}")}
+        return finished
+
+    def progress(self, prefix: str = "") -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) AS n FROM jobs WHERE substr(key, 1, ?) = ? GROUP BY status",
+                (len(prefix), prefix)
+            ).fetchall()
+        counts = {status: 0 for status in (PENDING, LEASED, DONE, FAILED)}
+        counts.update({row["status"]: row["n"] for row in rows})
+        return counts
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class RedisJobQueue(JobQueue):
+    """
+    Job queue on a Redis server (or anything speaking the same commands).
+
+    Each job is a hash ``<namespace>:job:<key>``; the sorted set
+    ``<namespace>:ready`` orders jobs by the time they become visible. A
+    claim takes the lease key ``<namespace>:lease:<key>`` with SET NX PX,
+    whose expiry is the visibility timeout, so only one worker holds a job
+    and a crashed worker's job reappears on its own. Only plain commands are
+    used (no scripts), so any Redis-compatible server or client works.
+    """
+
+    def __init__(self, client: Any, namespace: str = "jobs", **kwargs: Any):
+        super().__init__(**kwargs)
+        self.client = client
+        self.namespace = namespace
+
+    def _job(self, key: str) -> str:
+        return f"{self.namespace}:job:{key}"
+
+    def _lease(self, key: str) -> str:
+        return f"{self.namespace}:lease:{key}"
+
+    @property
+    def _ready(self) -> str:
+        return f"{self.namespace}:ready"
+
+    def enqueue(self, key: str, payload: Dict[str, Any]) -> bool:
+        if not self.client.hsetnx(self._job(key), "status", PENDING):
+            return False
+        now = time.time()
+        self.client.hset(self._job(key), mapping={
+            "payload": json.dumps(payload), "attempts": 0, "enqueued_at": now, "updated_at": now,
+        })
+        self.client.zadd(self._ready, {key: now}, nx=True)
+        return True
+
+    def claim(self, worker: str) -> Optional[Job]:
+        now = time.time()
+        for key in self.client.zrangebyscore(self._ready, "-inf", now, start=0, num=CLAIM_SCAN):
+            token = uuid.uuid4().hex
+            if not self.client.set(self._lease(key), token, nx=True, px=int(self.visibility_timeout * 1000)):
+                continue
+            # Move the job behind the visible ones until its lease runs out
+            self.client.zadd(self._ready, {key: now + self.visibility_timeout}, xx=True)
+            job = self.client.hgetall(self._job(key))
+            if not job or job.get("status") in FINAL_STATUSES:
+                # Finished between the scan and the lease
+                self.client.zrem(self._ready, key)
+                continue
+            attempts = int(self.client.hincrby(self._job(key), "attempts", 1))
+            if attempts > self.max_attempts:
+                self._finish(key, self._give_up_error(attempts), FAILED)
+                continue
+            self.client.hset(self._job(key), mapping={"status": LEASED, "worker": worker, "updated_at": time.time()})
+            return Job(key, json.loads(job["payload"]), attempts, token)
+        return None
+
+    def _finish(self, key: str, result: Dict[str, Any], status: str):
+        self.client.hset(self._job(key), mapping={"status": status, "result": json.dumps(result),
+                                                  "updated_at": time.time()})
+        self.client.zrem(self._ready, key)
+        self.client.delete(self._lease(key))
+
+    def complete(self, job: Job, result: Dict[str, Any], status: str = DONE) -> bool:
+        if self.client.hget(self._job(job.key), "status") in FINAL_STATUSES:
+            return False
+        self._finish(job.key, result, status)
+        return True
+
+    def release(self, job: Job):
+        if self.client.get(self._lease(job.key)) != job.token:
+            return
+        self.client.hincrby(self._job(job.key), "attempts", -1)
+        self.client.hset(self._job(job.key), mapping={"status": PENDING, "updated_at": time.time()})
+        self.client.zadd(self._ready, {job.key: time.time()}, xx=True)
+        self.client.delete(self._lease(job.key))
+
+    def results(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        finished = {}
+        for key in keys:
+            status, result = self.client.hmget(self._job(key), ["status", "result"])
+            if status in FINAL_STATUSES:
+                finished[key] = {"status": status, **json.loads(result or "{}")}
+        return finished
+
+    def progress(self, prefix: str = "") -> Dict[str, int]:
+        counts = {status: 0 for status in (PENDING, LEASED, DONE, FAILED)}
+        for name in self.client.scan_iter(match=f"{self.namespace}:job:{prefix}*", count=500):
+            status = self.client.hget(name, "status")
+            counts[status] = counts.get(status, 0) + 1
+        return counts
+
+    def close(self):
+        close = getattr(self.client, "close", None)
+        if close:
+            close()
+
+
+def open_job_queue(url: str, **kwargs: Any) -> JobQueue:
+    """
+    Open the queue at ``url``: ``sqlite:///path/to/jobs.db`` (or a plain path)
+    or ``redis://host:port/db``. The Redis client is an optional dependency.
+    """
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("Redis job queues need the redis package: pip install redis")
+        return RedisJobQueue(redis.Redis.from_url(url, decode_responses=True), **kwargs)
+    path = url[len("sqlite:///"):] if url.startswith("sqlite:///") else url
+    return SQLiteJobQueue(path, **kwargs)
+
+
+def print_progress(counts: Dict[str, int], label: str = "Jobs"):
+    """Print a one-line summary of job counts per status."""
+    total = sum(counts.values())
+    finished = counts.get(DONE, 0) + counts.get(FAILED, 0)
+    percent = finished / total * 100 if total else 100.0
+    print(f"📬 {label}: {finished}/{total} finished ({percent:.0f}%) - "
+          f"{counts.get(PENDING, 0)} pending, {counts.get(LEASED, 0)} running, "
+          f"{counts.get(DONE, 0)} done, {counts.get(FAILED, 0)} failed")
@@ -0,0 +1,141 @@
+# utils/journal.py
+"""
+Append-only JSONL journal used to checkpoint and resume flow runs
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+class RunJournal:
+    """
+    Append-only record of a CompanyFinderFlow run.
+
+    Each line is a JSON event: the discovered ``names`` once, then one
+    ``result`` per company with its status ("done", "excluded" or "failed")
+    and the institution data. Lines are flushed and fsynced as they are
+    written, so at most the company in flight is lost on a crash.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _append(self, event: Dict[str, Any]):
+        event["timestamp"] = datetime.now().isoformat()
+        line = json.dumps(event, ensure_ascii=False, default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def record_names(self, names: List[str]):
+        """Record the list of institution names produced by discovery."""
+        self._append({"event": "names", "names": list(names)})
+
+    def record_result(self, name: str, status: str, institution: Optional[Dict[str, Any]] = None):
+        """Record the outcome of researching one institution."""
+        self._append({"event": "result", "name": name, "status": status, "institution": institution})
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Replay the journal.
+
+        Returns a dict with the last recorded ``names`` (or None) and
+        ``results`` mapping each name to its latest result event. Truncated
+        trailing lines from an interrupted write are ignored.
+        """
+        names = None
+        results: Dict[str, Dict[str, Any]] = {}
+        if not self.path.exists():
+            return {"names": names, "results": results}
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if event.get("event") == "names":
+                    names = event["names"]
+                elif event.get("event") == "result":
+                    results[event["name"]] = event
+
+        return {"names": names, "results": results}
+
+
+def new_journal_path(checkpoint_dir: str) -> str:
+    """Return a fresh timestamped journal path inside the checkpoint directory."""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return str(Path(checkpoint_dir) / f"run_{timestamp}.jsonl")
+
+
+def latest_journal_path(checkpoint_dir: str) -> Optional[str]:
+    """Return the most recently modified journal in the checkpoint directory, if any."""
+    journals = sorted(Path(checkpoint_dir).glob("run_*.jsonl"), key=lambda p: p.stat().st_mtime)
+    return str(journals[-1]) if journals else None
+
+
+class DeadLetterQueue:
+    """
+    Companies whose research failed permanently, kept across runs.
+
+    Stored as a JSON object keyed by company name with the last error and the
+    number of failed attempts, rewritten atomically on every change so it
+    can be retried later with ``python main.py --retry-failed``.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            return {}
+
+    def _save(self, entries: Dict[str, Dict[str, Any]]):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def add(self, name: str, error: str):
+        """Record a failed company, counting repeated failures."""
+        with self._lock:
+            entries = self.load()
+            previous = entries.get(name, {})
+            entries[name] = {
+                "error": error,
+                "attempts": previous.get("attempts", 0) + 1,
+                "failed_at": datetime.now().isoformat(),
+            }
+            self._save(entries)
+
+    def remove(self, name: str):
+        """Forget a company once it has been researched successfully."""
+        with self._lock:
+            entries = self.load()
+            if entries.pop(name, None) is not None:
+                self._save(entries)
+
+    def names(self) -> List[str]:
+        return list(self.load())
+
+
+def dead_letter_path(checkpoint_dir: str) -> str:
+    """Return the dead-letter file kept in the checkpoint directory."""
+    return str(Path(checkpoint_dir) / "dead_letter.json")
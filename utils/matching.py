@@ -0,0 +1,456 @@
+# utils/matching.py
+"""
+Name normalization and fuzzy matching for institution names
+"""
+
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from models.data_models import Institution
+from .urls import organisation_key, site_key
+
+# Legal-form suffixes that do not distinguish one organisation from another
+LEGAL_SUFFIXES = {
+    'bv', 'nv', 'inc', 'incorporated', 'ltd', 'limited', 'llc', 'gmbh', 'plc', 'ag', 'sa', 'srl',
+    'corp', 'corporation', 'co', 'holding', 'holdings',
+}
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def normalize_name(name: str) -> str:
+    """
+    Reduce an institution name to a comparable form.
+
+    Accents and punctuation are stripped, case and whitespace are folded and
+    trailing legal forms (B.V., Inc., GmbH, ...) are dropped, so that
+    "ASML Holding N.V." and "asml" normalize to the same string.
+    """
+    text = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode('ascii').lower()
+    # Join dotted abbreviations such as "b.v." before splitting on punctuation
+    text = re.sub(r'\b(\w)\.(?=\w\.)', r'\1', text)
+    tokens = _NON_ALNUM.sub(' ', text).split()
+    while len(tokens) > 1 and tokens[-1] in LEGAL_SUFFIXES:
+        tokens.pop()
+    return ' '.join(tokens)
+
+
+def char_ngrams(text: str, n: int = 3) -> Set[str]:
+    """Return the set of character n-grams of a padded string."""
+    padded = f" {text} "
+    return {padded[i:i + n] for i in range(max(len(padded) - n + 1, 1))}
+
+
+def similarity(a: str, b: str) -> float:
+    """Edit-based similarity between two normalized names, from 0.0 to 1.0."""
+    return SequenceMatcher(None, a, b).ratio()
+
+
+# Shortest excluded name that typo-like spellings still match
+FUZZY_MIN_LENGTH = 6
+
+
+class ExclusionIndex:
+    """
+    Index of companies the user does not want researched.
+
+    A candidate name is excluded when, after normalization, it
+    - equals an excluded name or one of its aliases,
+    - contains all the words of an excluded name of two or more words
+      ("ING Bank Nederland" for "ING Bank"), or
+    - is within ``threshold`` edit similarity of one of at least
+      FUZZY_MIN_LENGTH characters (typos, "Amazn").
+
+    Single-word names only match exactly, through an alias or by typo, so
+    excluding "Meta" or "Amazon" leaves "Meta Materials" and "Amazon
+    Conservation Team" alone. Short names get no typo matching at all: one
+    letter is too big a change, and excluding "Meta" must not drop "Metal".
+
+    Lookups only compare against entries sharing a word or a character
+    trigram with the candidate, so the index stays fast for long lists.
+    """
+
+    def __init__(self, names: Iterable[str], aliases: Optional[Dict[str, List[str]]] = None,
+                 threshold: float = 0.88):
+        self.threshold = threshold
+        self._entries: Dict[str, str] = {}  # normalized form -> excluded name it stands for
+        self._by_token: Dict[str, Set[str]] = defaultdict(set)
+        self._by_ngram: Dict[str, Set[str]] = defaultdict(set)
+
+        aliases = aliases or {}
+        alias_lookup = {normalize_name(key): values for key, values in aliases.items()}
+        for name in names:
+            self._add(name, name)
+            for alias in alias_lookup.get(normalize_name(name), []):
+                self._add(alias, name)
+
+    def _add(self, form: str, excluded_name: str):
+        normalized = normalize_name(form)
+        if not normalized:
+            return
+        self._entries[normalized] = excluded_name
+        for token in normalized.split():
+            self._by_token[token].add(normalized)
+        for gram in char_ngrams(normalized):
+            self._by_ngram[gram].add(normalized)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def match(self, name: str) -> Optional[str]:
+        """Return the excluded name that ``name`` matches, or None."""
+        normalized = normalize_name(name)
+        if not normalized:
+            return None
+        if normalized in self._entries:
+            return self._entries[normalized]
+
+        tokens = set(normalized.split())
+        for token in tokens:
+            for entry in self._by_token.get(token, ()):
+                words = set(entry.split())
+                if len(words) > 1 and words <= tokens:
+                    return self._entries[entry]
+
+        candidates = set()
+        for gram in char_ngrams(normalized):
+            candidates.update(self._by_ngram.get(gram, ()))
+        for entry in candidates:
+            if len(entry) >= FUZZY_MIN_LENGTH and similarity(normalized, entry) >= self.threshold:
+                return self._entries[entry]
+        return None
+
+
+# Abbreviations and translations expanded before comparing institution names
+NAME_ABBREVIATIONS = {
+    'tu': 'university of technology',
+    'univ': 'university',
+    'uni': 'university',
+    'universiteit': 'university',
+    'hogeschool': 'university of applied sciences',
+    'hs': 'university of applied sciences',
+    'umc': 'university medical center',
+    'inst': 'institute',
+    'instituut': 'institute',
+    'centre': 'center',
+    'centrum': 'center',
+    'ctr': 'center',
+    'natl': 'national',
+    'intl': 'international',
+    'tech': 'technology',
+    'labs': 'lab',
+    'laboratory': 'lab',
+    'laboratories': 'lab',
+}
+
+# Words that carry no identity when comparing names
+NAME_STOPWORDS = {'the', 'of', 'and', 'for', 'in', 'at', 'de', 'het', 'van', 'der', 'voor', 'en'}
+
+
+def name_tokens(name: str) -> List[str]:
+    """Normalize a name, expand abbreviations and drop stopwords, returning sorted unique tokens."""
+    tokens = set()
+    for token in normalize_name(name).split():
+        for word in NAME_ABBREVIATIONS.get(token, token).split():
+            if word not in NAME_STOPWORDS:
+                tokens.add(word)
+    return sorted(tokens)
+
+
+# Edit similarity at which two differing words count as spellings of the same word
+TOKEN_TYPO_THRESHOLD = 0.8
+# Most character edits between spellings of one word; words shorter than TYPO_SHORT_WORD allow one
+TOKEN_TYPO_MAX_EDITS = 2
+TYPO_SHORT_WORD = 6
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance between ``a`` and ``b``, or ``limit + 1`` once it is known to exceed ``limit``."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def is_typo(a: str, b: str) -> bool:
+    """
+    Whether two different words are spellings of the same word ("amsterdm", "amsterdam").
+
+    A word inside the other is a different word with a prefix or suffix
+    ("physics", "geophysics"), never a typo.
+    """
+    if a in b or b in a:
+        return False
+    limit = 1 if min(len(a), len(b)) < TYPO_SHORT_WORD else TOKEN_TYPO_MAX_EDITS
+    return edit_distance(a, b, limit) <= limit
+
+
+def name_similarity(a: List[str], b: List[str]) -> float:
+    """
+    Score two token lists from ``name_tokens``.
+
+    Names score their token-set Jaccard overlap, so reordered words match.
+    Only when every word missing from the other name has a close spelling
+    there ("Amsterdm" for "Amsterdam", see ``is_typo``) do typos count, and
+    the name scores the mean similarity of its aligned words. One extra or different word
+    ("Royal ...", "Sea" vs "Space") therefore always costs a whole token.
+    Names whose numbers differ ("Lab 1" vs "Lab 2") never match.
+    """
+    set_a, set_b = set(a), set(b)
+    if {t for t in set_a if t.isdigit()} != {t for t in set_b if t.isdigit()}:
+        return 0.0
+    if not set_a or not set_b:
+        return 0.0
+    common = set_a & set_b
+    jaccard = len(common) / len(set_a | set_b)
+    only_a, only_b = sorted(set_a - common), sorted(set_b - common)
+    if len(only_a) != len(only_b):
+        return jaccard
+
+    # Pair the remaining words one to one, closest spellings first
+    pairs = sorted(((similarity(x, y), x, y) for x in only_a for y in only_b), reverse=True)
+    used_a, used_b, typo_score = set(), set(), 0.0
+    for score, x, y in pairs:
+        if x in used_a or y in used_b:
+            continue
+        if score < TOKEN_TYPO_THRESHOLD or not is_typo(x, y):
+            return jaccard
+        used_a.add(x)
+        used_b.add(y)
+        typo_score += score
+    return max(jaccard, (len(common) + typo_score) / len(set_a))
+
+
+# How far below the match threshold the trigram overlap of a candidate pair may fall
+BLOCKING_SLACK = 0.2
+
+
+class _UnionFind:
+    """Disjoint sets over integer ids whose root is always the smallest id."""
+
+    def __init__(self):
+        self.parent: List[int] = []
+
+    def add(self) -> int:
+        self.parent.append(len(self.parent))
+        return len(self.parent) - 1
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int):
+        root_i, root_j = self.find(i), self.find(j)
+        if root_i != root_j:
+            self.parent[max(root_i, root_j)] = min(root_i, root_j)
+
+
+class NameClusters:
+    """
+    Incremental clustering of spelling variants of the same institution.
+
+    Names with identical canonical tokens are merged directly. Otherwise each
+    name is only scored against earlier names sharing enough character
+    trigrams with it (blocking), and pairs scoring at least ``threshold`` are
+    joined. Trigrams occurring in more than ``max_block_size`` names are too
+    common to discriminate and are not used for blocking, which keeps the
+    number of comparisons roughly linear for tens of thousands of names.
+    """
+
+    def __init__(self, threshold: float = 0.9, max_block_size: int = 200):
+        self.threshold = threshold
+        self.max_block_size = max_block_size
+        self._clusters = _UnionFind()
+        self._originals: List[str] = []
+        self._token_lists: List[List[str]] = []
+        self._gram_counts: Dict[int, int] = {}
+        self._by_key: Dict[Tuple[str, ...], int] = {}
+        self._by_ngram: Dict[str, List[int]] = defaultdict(list)
+
+    def add(self, name: str) -> Optional[str]:
+        """
+        Add ``name`` and return the first name of its cluster so far: ``name``
+        itself when it matches nothing earlier, or None when it has no usable tokens.
+        """
+        tokens = name_tokens(name)
+        if not tokens:
+            return None
+        clusters = self._clusters
+        i = clusters.add()
+        self._originals.append(name)
+        self._token_lists.append(tokens)
+
+        key = tuple(tokens)
+        if key in self._by_key:
+            clusters.union(self._by_key[key], i)
+            return self._originals[clusters.find(i)]
+        self._by_key[key] = i
+
+        grams = char_ngrams(' '.join(tokens))
+        for j in self._similar(tokens, grams):
+            if clusters.find(j) != clusters.find(i):
+                clusters.union(i, j)
+        self._gram_counts[i] = len(grams)
+        for gram in grams:
+            self._by_ngram[gram].append(i)
+        return self._originals[clusters.find(i)]
+
+    def match(self, name: str) -> Optional[str]:
+        """Return the first name of the cluster ``name`` would join, without adding it, or None."""
+        tokens = name_tokens(name)
+        if not tokens:
+            return None
+        key = tuple(tokens)
+        if key in self._by_key:
+            return self._originals[self._clusters.find(self._by_key[key])]
+        similar = self._similar(tokens, char_ngrams(' '.join(tokens)))
+        return self._originals[min(self._clusters.find(j) for j in similar)] if similar else None
+
+    def _similar(self, tokens: List[str], grams: Set[str]) -> List[int]:
+        """Return the earlier names scoring at least ``threshold`` against ``tokens``."""
+        shared: Counter = Counter()
+        for gram in grams:
+            posting = self._by_ngram.get(gram, ())
+            if len(posting) <= self.max_block_size:
+                shared.update(posting)
+
+        # Similar names share most of their trigrams; only score pairs whose
+        # trigram overlap (Dice coefficient) comes close to the threshold
+        min_overlap = self.threshold - BLOCKING_SLACK
+        return [
+            j for j, count in shared.items()
+            if 2 * count / (len(grams) + self._gram_counts[j]) >= min_overlap
+            and name_similarity(tokens, self._token_lists[j]) >= self.threshold
+        ]
+
+    def resolve(self) -> Tuple[List[str], Dict[str, str]]:
+        """Return the first name of every cluster, in input order, and a mapping from each variant to it."""
+        kept: List[str] = []
+        duplicates: Dict[str, str] = {}
+        for i, name in enumerate(self._originals):
+            root = self._clusters.find(i)
+            if root == i:
+                kept.append(name)
+            elif name != self._originals[root]:
+                duplicates[name] = self._originals[root]
+        return kept, duplicates
+
+
+def resolve_duplicate_names(names: Iterable[str], threshold: float = 0.9,
+                            max_block_size: int = 200) -> Tuple[List[str], Dict[str, str]]:
+    """
+    Cluster spelling variants of the same institution (see ``NameClusters``).
+
+    Returns the first occurrence of every cluster, in input order, and a
+    mapping from each dropped variant to the name that was kept.
+    """
+    clusters = NameClusters(threshold, max_block_size)
+    for name in names:
+        clusters.add(name)
+    return clusters.resolve()
+
+
+def _is_blank(value) -> bool:
+    return value is None or (isinstance(value, str) and value.strip().lower() in ('', 'n/a', 'none', 'unknown'))
+
+
+def merge_institutions(primary: Institution, other: Institution) -> Institution:
+    """
+    Combine two records of the same institution field by field.
+
+    Fields blank in ``primary`` are filled from ``other``; ``interest_match``
+    keeps the interests of both records, and ``last_updated`` the most recent
+    timestamp.
+    """
+    merged = primary.model_dump()
+    extra = other.model_dump()
+    for field, value in extra.items():
+        if _is_blank(merged.get(field)) and not _is_blank(value):
+            merged[field] = value
+
+    interests = []
+    for record in (primary, other):
+        for interest in (record.interest_match or '').split(','):
+            if interest.strip() and interest.strip() not in interests:
+                interests.append(interest.strip())
+    merged['interest_match'] = ', '.join(interests) or None
+
+    timestamps = [t for t in (primary.last_updated, other.last_updated) if t]
+    merged['last_updated'] = max(timestamps) if timestamps else None
+    return Institution(**merged)
+
+
+class InstitutionDeduplicator:
+    """
+    Single-pass merging of records describing the same institution.
+
+    Records collide when their websites share an organisation key (the host,
+    so ``http://tno.nl`` and ``https://www.tno.nl/`` match), or when their
+    canonical name tokens are equal and either one has no usable website or
+    both websites sit on the same registrable domain (``tno.nl`` and
+    ``careers.tno.nl``). Sibling institutions on subdomains of one parent
+    (``mpi-inf.mpg.de``, ``is.mpg.de``) therefore stay apart. Colliding
+    records are merged with ``merge_institutions`` into the first one seen.
+    Records can be added as they arrive.
+    """
+
+    def __init__(self):
+        self.institutions: List[Institution] = []
+        self.merged_count = 0
+        self._keys: List[str] = []
+        self._sites: List[str] = []
+        self._by_key: Dict[str, int] = {}
+        self._by_name: Dict[Tuple[str, ...], int] = {}
+
+    def add(self, inst: Institution) -> int:
+        """Add a record and return the index of the (possibly merged) record it ended up in."""
+        unique, keys, sites = self.institutions, self._keys, self._sites
+        key = organisation_key(inst.website_url)
+        site = site_key(inst.website_url) if key else ''
+        name_key = tuple(name_tokens(inst.name))
+
+        index = self._by_key.get(key) if key else None
+        if index is None and name_key in self._by_name:
+            candidate = self._by_name[name_key]
+            if not key or not keys[candidate] or sites[candidate] == site:
+                index = candidate
+
+        if index is None:
+            index = len(unique)
+            unique.append(inst)
+            keys.append(key)
+            sites.append(site)
+        else:
+            unique[index] = merge_institutions(unique[index], inst)
+            self.merged_count += 1
+            if key and not keys[index]:
+                keys[index], sites[index] = key, site
+
+        if key:
+            self._by_key.setdefault(key, index)
+        if name_key:
+            self._by_name.setdefault(name_key, index)
+        return index
+
+
+def deduplicate_institutions(institutions: Iterable[Institution]) -> Tuple[List[Institution], int]:
+    """
+    Merge records describing the same institution, in a single pass (see
+    ``InstitutionDeduplicator``). Returns the merged records in first-seen
+    order and the number of records folded into others.
+    """
+    deduplicator = InstitutionDeduplicator()
+    for inst in institutions:
+        deduplicator.add(inst)
+    return deduplicator.institutions, deduplicator.merged_count
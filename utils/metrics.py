@@ -0,0 +1,224 @@
+# utils/metrics.py
+"""
+Run instrumentation: per-stage, per-crew and per-company time, tokens, tool calls and cache hits
+"""
+
+import contextvars
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+COUNTERS = [
+    "llm_calls",
+    "llm_cache_hits",
+    "prompt_tokens",
+    "completion_tokens",
+    "search_calls",
+    "search_cache_hits",
+    "scrape_calls",
+    "scrape_cache_hits",
+]
+
+
+def _empty_counters() -> Dict[str, int]:
+    return {counter: 0 for counter in COUNTERS}
+
+
+class RunMetrics:
+    """
+    Collects timings and usage counters for one workflow run.
+
+    Counters are kept globally and for the company (or batch of companies)
+    being researched in the current thread, so LLM and tool calls made by
+    worker threads are attributed to the right company. Flow steps get the
+    difference of the global counters over their duration.
+    """
+
+    def __init__(self, costs: Optional[Dict[str, float]] = None):
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.costs = costs or {}
+        self.totals = _empty_counters()
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.crews: List[Dict[str, Any]] = []
+        self.companies: Dict[str, Dict[str, Any]] = {}
+        self.milestones: Dict[str, float] = {}
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._scope: contextvars.ContextVar[Optional[Dict[str, int]]] = contextvars.ContextVar("metrics_scope", default=None)
+
+    def count(self, **increments: int):
+        """Add to the global counters and to those of the current company, if any."""
+        scope = self._scope.get()
+        with self._lock:
+            for counter, value in increments.items():
+                self.totals[counter] += value
+                if scope is not None:
+                    scope[counter] += value
+
+    def record_llm_call(self, cached: bool, prompt_tokens: int = 0, completion_tokens: int = 0):
+        self.count(llm_calls=1, llm_cache_hits=int(cached),
+                   prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+
+    def record_tool_call(self, tool: str, cached: bool):
+        """Record a "search" or "scrape" tool call."""
+        self.count(**{f"{tool}_calls": 1, f"{tool}_cache_hits": int(cached)})
+
+    def record_crew(self, kind: str, label: str, seconds: float, usage: Any = None):
+        """Record one crew kickoff and the token usage reported in its CrewOutput."""
+        entry = {"kind": kind, "label": label, "seconds": round(seconds, 3)}
+        for field in ("prompt_tokens", "completion_tokens", "total_tokens", "cached_prompt_tokens", "successful_requests"):
+            entry[field] = getattr(usage, field, 0) or 0
+        with self._lock:
+            self.crews.append(entry)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a flow step and attribute the counters that moved meanwhile to it."""
+        with self._lock:
+            before = dict(self.totals)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            with self._lock:
+                entry = {counter: self.totals[counter] - before[counter] for counter in COUNTERS}
+                self.stages[name] = {"seconds": round(seconds, 3), **entry}
+
+    @contextmanager
+    def company(self, names: List[str]):
+        """Attribute the calls made in this block to ``names``, split evenly for batches."""
+        counters = _empty_counters()
+        token = self._scope.set(counters)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._scope.reset(token)
+            seconds = time.perf_counter() - start
+            share = 1 / len(names)
+            with self._lock:
+                for name in names:
+                    entry = self.companies.setdefault(name, {"seconds": 0.0, "status": None, **_empty_counters()})
+                    entry["seconds"] = round(entry["seconds"] + seconds * share, 3)
+                    for counter, value in counters.items():
+                        entry[counter] += value * share
+                    if len(names) > 1:
+                        entry["batch"] = list(names)
+
+    def merge(self, report: Dict[str, Any]):
+        """Add the counters, crews and companies of another collector's report (e.g. a worker process)."""
+        with self._lock:
+            for counter in COUNTERS:
+                self.totals[counter] += report["totals"].get(counter, 0)
+            self.crews.extend(report["crews"])
+            for name, entry in report["companies"].items():
+                # Outcomes may be recorded here before the worker's report arrives; keep their status
+                status = entry.get("status") or self.companies.get(name, {}).get("status")
+                self.companies[name] = {**{key: value for key, value in entry.items() if key != "cost"}, "status": status}
+
+    def take_company(self, name: str) -> Dict[str, Any]:
+        """Remove ``name`` from this collector and return its share as a report for ``merge`` elsewhere."""
+        with self._lock:
+            entry = self.companies.pop(name, None) or {"seconds": 0.0, "status": None, **_empty_counters()}
+            crews = [crew for crew in self.crews if crew["label"] == name]
+            self.crews = [crew for crew in self.crews if crew["label"] != name]
+        return {"totals": {counter: entry[counter] for counter in COUNTERS}, "crews": crews, "companies": {name: entry}}
+
+    def mark(self, milestone: str):
+        """Record the seconds since the start of the run at which ``milestone`` was first reached."""
+        with self._lock:
+            self.milestones.setdefault(milestone, round(time.perf_counter() - self._start, 3))
+
+    def set_status(self, name: str, status: str):
+        with self._lock:
+            self.companies.setdefault(name, {"seconds": 0.0, **_empty_counters()})["status"] = status
+
+    def estimated_cost(self, counters: Dict[str, float]) -> float:
+        """Estimate the spend implied by a set of counters, in the configured currency."""
+        return (
+            counters["prompt_tokens"] / 1e6 * self.costs.get("llm_input_per_mtok", 0)
+            + counters["completion_tokens"] / 1e6 * self.costs.get("llm_output_per_mtok", 0)
+            + (counters["search_calls"] - counters["search_cache_hits"]) / 1000 * self.costs.get("search_per_1k", 0)
+            + (counters["scrape_calls"] - counters["scrape_cache_hits"]) / 1000 * self.costs.get("scrape_per_1k", 0)
+        )
+
+    def report(self) -> Dict[str, Any]:
+        """Return the run report as a JSON-serialisable dict."""
+        with self._lock:
+            companies = {
+                name: {**entry, **{c: round(entry[c], 1) for c in COUNTERS}, "cost": round(self.estimated_cost(entry), 4)}
+                for name, entry in self.companies.items()
+            }
+            return {
+                "started_at": self.started_at,
+                "seconds": round(time.perf_counter() - self._start, 3),
+                "milestones": dict(self.milestones),
+                "totals": {**self.totals, "cost": round(self.estimated_cost(self.totals), 4)},
+                "stages": {name: {**entry, "cost": round(self.estimated_cost(entry), 4)} for name, entry in self.stages.items()},
+                "crews": list(self.crews),
+                "companies": companies,
+            }
+
+    def write_report(self, path: str) -> str:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+        return path
+
+    def print_summary(self, slowest: int = 5):
+        """Print a per-stage table, the slowest companies and the run totals."""
+        report = self.report()
+        header = f"{'':<28} {'seconds':>9} {'LLM calls':>10} {'tokens in':>10} {'tokens out':>11} {'searches':>9} {'scrapes':>8} {'cost':>8}"
+
+        def row(label, entry):
+            return (f"{label[:28]:<28} {entry['seconds']:>9.1f} "
+                    f"{entry['llm_calls']:>5.0f} ({entry['llm_cache_hits']:>2.0f}) "
+                    f"{entry['prompt_tokens']:>10.0f} {entry['completion_tokens']:>11.0f} "
+                    f"{entry['search_calls']:>4.0f} ({entry['search_cache_hits']:>2.0f}) "
+                    f"{entry['scrape_calls']:>3.0f} ({entry['scrape_cache_hits']:>2.0f}) {entry['cost']:>8.4f}")
+
+        print("\n📊 Run summary (cache hits in parentheses)")
+        print(header)
+        print("-" * len(header))
+        for name, entry in report["stages"].items():
+            print(row(name, entry))
+        print("-" * len(header))
+        print(row("total", {**report["totals"], "seconds": report["seconds"]}))
+        if "first_result" in report["milestones"]:
+            print(f"First institution researched after {report['milestones']['first_result']:.1f}s")
+
+        companies = sorted(report["companies"].items(), key=lambda item: item[1]["seconds"], reverse=True)
+        if companies:
+            print("\nSlowest companies:")
+            for name, entry in companies[:slowest]:
+                print(row(f"{name} [{entry['status']}]", entry))
+
+
+_metrics = RunMetrics()
+
+
+def get_run_metrics() -> RunMetrics:
+    """Return the metrics collector of the current run."""
+    return _metrics
+
+
+def start_run_metrics(costs: Optional[Dict[str, float]] = None) -> RunMetrics:
+    """Start collecting metrics for a new run."""
+    global _metrics
+    _metrics = RunMetrics(costs)
+    return _metrics
+
+
+def timed_stage(method):
+    """Decorator recording a flow step as a stage of the run metrics."""
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        with get_run_metrics().stage(method.__name__):
+            return method(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,76 @@
+# utils/pool.py
+"""
+Reusable objects shared by worker threads: an object pool and a keep-alive HTTP session
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Generic, List, Optional, TypeVar
+
+import requests
+from requests.adapters import HTTPAdapter
+
+T = TypeVar("T")
+
+
+class ObjectPool(Generic[T]):
+    """
+    Thread-safe pool of objects that are expensive to build.
+
+    Workers check an object out, use it exclusively and return it, so the
+    pool grows to the number of workers using it at once and no further.
+    ``reset`` is called on every object as it is checked out, to clear
+    state left behind by the previous user.
+    """
+
+    def __init__(self, factory: Callable[[], T], reset: Optional[Callable[[T], None]] = None):
+        self.factory = factory
+        self.reset = reset
+        self.created = 0
+        self.checkouts = 0
+        self._idle: List[T] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def checkout(self):
+        with self._lock:
+            self.checkouts += 1
+            item = self._idle.pop() if self._idle else None
+        if item is None:
+            item = self.factory()
+            with self._lock:
+                self.created += 1
+        if self.reset is not None:
+            self.reset(item)
+        try:
+            yield item
+        finally:
+            with self._lock:
+                self._idle.append(item)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"created": self.created, "checkouts": self.checkouts, "idle": len(self._idle)}
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_http_session(max_connections: int = 10) -> requests.Session:
+    """
+    Return the process-wide HTTP session.
+
+    Connections are kept alive and reused per host, so repeated requests to
+    the same API skip the TCP and TLS handshakes. ``max_connections`` sizes
+    the per-host pool on first use; it should cover the number of threads
+    making requests at once.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=max_connections)
+            _session = requests.Session()
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
@@ -0,0 +1,200 @@
+# utils/rate_limit.py
+"""
+Per-provider rate limiting with adaptive concurrency
+"""
+
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# Messages of rate-limit errors that carry no status code (e.g. re-raised as text by a tool)
+_RATE_LIMIT_MESSAGE = re.compile(r'\brate[\s_-]?limit|\btoo many requests\b')
+
+# Latencies this many times above the running baseline are treated as congestion
+CONGESTION_FACTOR = 3.0
+
+
+class TokenBucket:
+    """
+    Classic token bucket: ``rate`` tokens per second, holding at most ``capacity``.
+
+    ``acquire`` blocks until a token is available. ``pause`` empties the bucket
+    and holds it closed for a while, e.g. for a provider's Retry-After.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        if now < self._paused_until:
+            self._updated = now
+            return
+        elapsed = now - max(self._updated, self._paused_until)
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1.0):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._paused_until and self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self._tokens = 0.0
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Concurrency cap tuned by AIMD (additive increase, multiplicative decrease).
+
+    Every successful request raises the limit by ``1 / limit``, so about one
+    extra slot per window of requests, up to ``max_limit``. A rate-limit
+    response halves it, and a request far slower than the running latency
+    baseline shrinks it by 10%, never below ``min_limit``.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1, initial: Optional[float] = None):
+        self.max_limit = max(max_limit, 1)
+        self.min_limit = max(min(min_limit, self.max_limit), 1)
+        self.limit = float(initial or self.max_limit)
+        self.in_flight = 0
+        self._baseline: Optional[float] = None
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self, latency: float):
+        with self._cond:
+            if self._baseline is not None and latency > CONGESTION_FACTOR * self._baseline:
+                self.limit = max(self.min_limit, self.limit * 0.9)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            # Slow-moving average so a single outlier does not move the baseline
+            self._baseline = latency if self._baseline is None else 0.9 * self._baseline + 0.1 * latency
+            self._cond.notify_all()
+
+    def on_throttle(self):
+        with self._cond:
+            self.limit = max(self.min_limit, self.limit / 2)
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Return the Retry-After delay carried by an HTTP error, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """
+    Recognise 429 / rate-limit errors from requests, OpenAI/litellm and the crewai tools.
+
+    The status code decides when the error carries one, then the exception
+    type (``RateLimitError``). Only errors with neither fall back to the
+    message, which must say "rate limit" or "too many requests": a bare 429
+    in a URL, request id or byte count is not enough.
+    """
+    for source in (error, getattr(error, "response", None)):
+        status = getattr(source, "status_code", None) or getattr(source, "status", None)
+        if isinstance(status, int):
+            return status == 429
+    if any("ratelimit" in cls.__name__.lower() for cls in type(error).__mro__):
+        return True
+    return bool(_RATE_LIMIT_MESSAGE.search(str(error).lower()))
+
+
+class RateLimiter:
+    """
+    Rate limit for one provider: a token bucket for the request rate and an
+    adaptive concurrency cap, shared by every thread in the process.
+
+    Wrap each request in ``with limiter.limit():``. Rate-limit errors raised
+    inside the block shrink the concurrency cap and pause the bucket (for
+    the provider's Retry-After when given) before being re-raised.
+    """
+
+    def __init__(self, name: str, requests_per_minute: float, max_concurrency: int, cooldown_seconds: float = 5.0):
+        self.name = name
+        self.bucket = TokenBucket(requests_per_minute / 60.0, capacity=max_concurrency)
+        self.concurrency = AdaptiveConcurrencyLimiter(max_concurrency)
+        self.cooldown_seconds = cooldown_seconds
+        self.requests = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def limit(self):
+        self.concurrency.acquire()
+        try:
+            self.bucket.acquire()
+            start = time.monotonic()
+            try:
+                yield
+            except Exception as e:
+                if is_rate_limit_error(e):
+                    self.report_throttle(retry_after_seconds(e))
+                raise
+            self.concurrency.on_success(time.monotonic() - start)
+            with self._lock:
+                self.requests += 1
+        finally:
+            self.concurrency.release()
+
+    def report_throttle(self, retry_after: Optional[float] = None):
+        """Record a rate-limit response seen by the provider."""
+        self.concurrency.on_throttle()
+        self.bucket.pause(retry_after if retry_after is not None else self.cooldown_seconds)
+        with self._lock:
+            self.throttled += 1
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, requests_per_minute: float = 60, max_concurrency: int = 4) -> RateLimiter:
+    """Return the process-wide limiter for a provider, creating it on first use."""
+    with _limiters_lock:
+        if name not in _limiters:
+            _limiters[name] = RateLimiter(name, requests_per_minute, max_concurrency)
+        return _limiters[name]
+
+
+def print_rate_limit_stats():
+    """Print request and throttle counts per provider."""
+    if not _limiters:
+        return
+    print("\n🚦 Rate limits:")
+    for name, limiter in _limiters.items():
+        print(f"  {name}: {limiter.requests} requests, {limiter.throttled} throttled, "
+              f"concurrency {int(limiter.concurrency.limit)}/{limiter.concurrency.max_limit}")
@@ -0,0 +1,118 @@
+# utils/retry.py
+"""
+Retries with jittered backoff and per-company time/token budgets
+"""
+
+import contextvars
+import random
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional, TypeVar
+
+import requests
+
+from .rate_limit import is_rate_limit_error
+
+T = TypeVar("T")
+
+# Exception class names (OpenAI, litellm, httpx) that indicate a temporary provider problem
+TRANSIENT_ERROR_NAMES = {
+    'APIConnectionError', 'APITimeoutError', 'InternalServerError', 'ServiceUnavailableError',
+    'Timeout', 'TimeoutException', 'ConnectError', 'ReadTimeout', 'RemoteProtocolError',
+}
+
+
+class BudgetExceeded(RuntimeError):
+    """Raised when a company has used up its wall-clock or token budget."""
+
+
+class Budget:
+    """
+    Wall-clock and token allowance for researching one company (or one batch).
+
+    The budget is cooperative: the LLM wrapper and the tools call ``check``
+    before each provider request and ``charge`` with the tokens used, so an
+    over-budget crew stops at its next step instead of running on.
+    """
+
+    def __init__(self, seconds: Optional[float] = None, tokens: Optional[int] = None):
+        self.deadline = time.monotonic() + seconds if seconds else None
+        self.token_limit = tokens
+        self.tokens_used = 0
+
+    def remaining_seconds(self) -> Optional[float]:
+        return None if self.deadline is None else self.deadline - time.monotonic()
+
+    def charge(self, tokens: int):
+        self.tokens_used += max(int(tokens), 0)
+
+    def check(self):
+        remaining = self.remaining_seconds()
+        if remaining is not None and remaining <= 0:
+            raise BudgetExceeded("time budget exhausted")
+        if self.token_limit and self.tokens_used >= self.token_limit:
+            raise BudgetExceeded(f"token budget exhausted ({self.tokens_used}/{self.token_limit} tokens)")
+
+
+_current_budget: contextvars.ContextVar[Optional[Budget]] = contextvars.ContextVar("budget", default=None)
+
+
+def current_budget() -> Optional[Budget]:
+    """Return the budget of the company being researched in this thread, if any."""
+    return _current_budget.get()
+
+
+def check_budget():
+    """Raise BudgetExceeded if the current company is over budget."""
+    budget = _current_budget.get()
+    if budget is not None:
+        budget.check()
+
+
+@contextmanager
+def budget_scope(budget: Budget):
+    """Make ``budget`` the current budget for the duration of the block."""
+    token = _current_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _current_budget.reset(token)
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """Return True for failures worth retrying: rate limits, timeouts, connection errors and 5xx responses."""
+    if isinstance(error, BudgetExceeded):
+        return False
+    if is_rate_limit_error(error):
+        return True
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int) and 500 <= status < 600:
+        return True
+    return type(error).__name__ in TRANSIENT_ERROR_NAMES
+
+
+def retry_call(fn: Callable[[], T], attempts: int = 3, base_delay: float = 1.0, max_delay: float = 30.0,
+               should_retry: Callable[[BaseException], bool] = is_transient_error) -> T:
+    """
+    Call ``fn`` until it succeeds, retrying transient failures.
+
+    Waits use exponential backoff with full jitter (a random delay between 0
+    and ``base_delay * 2**attempt``, capped at ``max_delay``) so that workers
+    hit by the same outage do not retry in lockstep. Retries stop early when
+    the current budget would run out during the wait.
+    """
+    for attempt in range(attempts):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == attempts - 1 or not should_retry(e):
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            budget = _current_budget.get()
+            remaining = budget.remaining_seconds() if budget else None
+            if remaining is not None and remaining <= delay:
+                raise
+            print(f"⏳ {type(e).__name__}: retrying in {delay:.1f}s (attempt {attempt + 2}/{attempts})")
+            time.sleep(delay)
@@ -0,0 +1,72 @@
+# utils/sinks.py
+"""
+Streaming output sinks for institutions
+"""
+
+import csv
+import json
+import os
+import threading
+from typing import Optional
+from models.data_models import Institution
+
+# Column order used for every CSV the workflow writes
+INSTITUTION_FIELDS = [
+    "name",
+    "type",
+    "website_url",
+    "careers_url",
+    "location",
+    "size",
+    "industry",
+    "interest_match",
+    "description",
+    "last_updated",
+]
+
+
+class InstitutionSink:
+    """
+    Append institutions to ``<base_path>.csv`` and ``<base_path>.jsonl`` as they arrive.
+
+    Every record is flushed immediately so other processes can tail the files
+    during a run; with ``fsync=True`` it is also forced to disk. Safe to call
+    from several worker threads.
+    """
+
+    def __init__(self, base_path: str, fsync: bool = False):
+        self.csv_path = f"{base_path}.csv"
+        self.jsonl_path = f"{base_path}.jsonl"
+        self.fsync = fsync
+        self.count = 0
+        self._lock = threading.Lock()
+
+        write_header = not os.path.exists(self.csv_path) or os.path.getsize(self.csv_path) == 0
+        self._csv_file = open(self.csv_path, "a", newline="", encoding="utf-8")
+        self._jsonl_file = open(self.jsonl_path, "a", encoding="utf-8")
+        self._writer = csv.DictWriter(self._csv_file, fieldnames=INSTITUTION_FIELDS, extrasaction="ignore")
+        if write_header:
+            self._writer.writeheader()
+            self._csv_file.flush()
+
+    def write(self, inst: Institution):
+        """Append one institution to both files."""
+        record = inst.model_dump()
+        with self._lock:
+            self._writer.writerow(record)
+            self._jsonl_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            for f in (self._csv_file, self._jsonl_file):
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            self.count += 1
+
+    def on_result(self, name: str, result: Optional[object]):
+        """Flow listener: stream enriched institutions and ignore excluded or failed companies."""
+        if isinstance(result, Institution):
+            self.write(result)
+
+    def close(self):
+        with self._lock:
+            self._csv_file.close()
+            self._jsonl_file.close()
@@ -0,0 +1,158 @@
+# utils/store.py
+"""
+Persistent SQLite store that merges institutions across runs
+"""
+
+import csv
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from models.data_models import Institution
+from .matching import merge_institutions, name_tokens
+from .sinks import INSTITUTION_FIELDS
+from .urls import organisation_key, site_key
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS institutions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    domain TEXT NOT NULL DEFAULT '',
+    name_key TEXT NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT,
+    website_url TEXT,
+    careers_url TEXT,
+    location TEXT,
+    size TEXT,
+    industry TEXT,
+    interest_match TEXT,
+    description TEXT,
+    last_updated TEXT,
+    first_seen TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_institutions_domain ON institutions(domain);
+CREATE INDEX IF NOT EXISTS idx_institutions_name_key ON institutions(name_key);
+CREATE INDEX IF NOT EXISTS idx_institutions_type ON institutions(type);
+"""
+
+
+class InstitutionStore:
+    """
+    Institutions collected by every run, merged into one record per organisation.
+
+    Records are matched the same way as ``deduplicate_institutions``: on the
+    organisation key of their website (its host) or on their canonical name
+    when either side has no usable website or both websites sit on the same
+    registrable domain. A matching record is merged field by field, with the
+    more recently researched record taking precedence. Several processes can
+    share the file; writes are serialized by SQLite.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        if self.path.parent != Path('.'):
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def _find(self, domain: str, name_key: str, site: str) -> Optional[sqlite3.Row]:
+        if domain:
+            row = self._conn.execute("SELECT * FROM institutions WHERE domain = ? LIMIT 1", (domain,)).fetchone()
+            if row is not None:
+                return row
+        rows = self._conn.execute(
+            "SELECT * FROM institutions WHERE name_key = ? ORDER BY domain = '', id", (name_key,)
+        ).fetchall()
+        for row in rows:
+            # Same name on another host only merges within one registrable domain
+            if not domain or not row['domain'] or site_key(row['website_url']) == site:
+                return row
+        return None
+
+    @staticmethod
+    def _to_institution(row: sqlite3.Row) -> Institution:
+        return Institution(**{field: row[field] for field in INSTITUTION_FIELDS})
+
+    def upsert(self, institutions: Iterable[Institution]) -> int:
+        """Insert or merge institutions in one transaction; returns the number of records written."""
+        now = datetime.now().isoformat()
+        count = 0
+        with self._lock, self._conn:
+            for inst in institutions:
+                domain = organisation_key(inst.website_url)
+                name_key = ' '.join(name_tokens(inst.name))
+                row = self._find(domain, name_key, site_key(inst.website_url) if domain else '')
+
+                if row is None:
+                    values = inst.model_dump()
+                    self._conn.execute(
+                        f"INSERT INTO institutions (domain, name_key, {', '.join(INSTITUTION_FIELDS)}, first_seen, updated_at) "
+                        f"VALUES (?, ?, {', '.join('?' for _ in INSTITUTION_FIELDS)}, ?, ?)",
+                        [domain, name_key, *(values[field] for field in INSTITUTION_FIELDS), now, now],
+                    )
+                else:
+                    existing = self._to_institution(row)
+                    if (inst.last_updated or '') >= (existing.last_updated or ''):
+                        merged = merge_institutions(inst, existing)
+                    else:
+                        merged = merge_institutions(existing, inst)
+                    values = merged.model_dump()
+                    self._conn.execute(
+                        f"UPDATE institutions SET domain = ?, {', '.join(f'{field} = ?' for field in INSTITUTION_FIELDS)}, "
+                        f"updated_at = ? WHERE id = ?",
+                        [organisation_key(merged.website_url) or row['domain'] or domain,
+                         *(values[field] for field in INSTITUTION_FIELDS), now, row['id']],
+                    )
+                count += 1
+        return count
+
+    def query(self, interest: Optional[str] = None, location: Optional[str] = None,
+              institution_type: Optional[str] = None) -> List[Institution]:
+        """Return stored institutions, optionally filtered by (case-insensitive) substring matches."""
+        clauses, params = [], []
+        for column, value in (('interest_match', interest), ('location', location), ('type', institution_type)):
+            if value:
+                clauses.append(f"{column} LIKE ?")
+                params.append(f"%{value}%")
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(f"SELECT * FROM institutions {where} ORDER BY name COLLATE NOCASE", params).fetchall()
+        return [self._to_institution(row) for row in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM institutions").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def export_institutions(institutions: List[Institution], path: str) -> str:
+    """
+    Write institutions to ``path`` as CSV, or as Parquet when the path ends in ``.parquet``.
+
+    Parquet output needs pandas with pyarrow (or fastparquet) installed.
+    """
+    if path.lower().endswith('.parquet'):
+        import pandas as pd
+        frame = pd.DataFrame([inst.model_dump() for inst in institutions], columns=INSTITUTION_FIELDS)
+        try:
+            frame.to_parquet(path, index=False)
+        except ImportError as e:
+            raise ImportError(f"Parquet export needs pyarrow or fastparquet: {e}") from e
+        return path
+
+    with open(path, mode="w", newline="", encoding="utf-8") as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=INSTITUTION_FIELDS)
+        writer.writeheader()
+        for inst in institutions:
+            writer.writerow(inst.model_dump())
+    return path
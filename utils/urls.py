@@ -0,0 +1,115 @@
+# utils/urls.py
+"""
+URL normalization helpers
+"""
+
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track the visitor and never change the page content
+TRACKING_PARAMS = {
+    'gclid', 'fbclid', 'msclkid', 'mc_cid', 'mc_eid', 'ref', 'ref_src', '_ga', '_hsenc', '_hsmi',
+}
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Return a canonical form of a URL for use as a lookup key.
+
+    The scheme is normalized to https, the host is lowercased and stripped of
+    ``www.`` and default ports, tracking parameters and fragments are dropped,
+    the remaining query parameters are sorted and trailing slashes removed.
+    URLs that cannot be parsed (a bad port, an unclosed ``[``) have no
+    canonical form and return an empty string, like missing ones.
+    """
+    url = (url or '').strip()
+    if not url:
+        return ''
+    if '://' not in url:
+        url = f"https://{url}"
+
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return ''
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower().rstrip('.')
+    if host.startswith('www.'):
+        host = host[4:]
+    if port and port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    ]
+    path = parts.path.rstrip('/')
+
+    return urlunsplit(('https', host, path, urlencode(sorted(query)), ''))
+
+
+# Public suffixes made of two labels, under which organisations register their own domain
+MULTI_PART_SUFFIXES = {
+    'co.uk', 'ac.uk', 'org.uk', 'gov.uk', 'ltd.uk', 'nhs.uk', 'co.jp', 'ac.jp', 'or.jp', 'co.kr', 'ac.kr',
+    'com.au', 'edu.au', 'gov.au', 'org.au', 'co.nz', 'ac.nz', 'com.br', 'com.cn', 'edu.cn', 'com.sg', 'edu.sg',
+    'co.in', 'ac.in', 'co.za', 'ac.za', 'com.tr', 'edu.tr', 'co.il', 'ac.il', 'com.mx', 'ac.at', 'gv.at',
+}
+
+# Hosts shared by many organisations, where the domain says nothing about who owns the page
+SHARED_HOSTS = {
+    'linkedin.com', 'facebook.com', 'twitter.com', 'x.com', 'instagram.com', 'youtube.com', 'github.com',
+    'github.io', 'gitlab.io', 'wikipedia.org', 'medium.com', 'wordpress.com', 'blogspot.com', 'google.com',
+    'notion.site', 'wixsite.com', 'crunchbase.com', 'glassdoor.com', 'indeed.com',
+    # Government portals hosting every ministry and agency under one domain
+    'government.nl', 'rijksoverheid.nl', 'overheid.nl', 'gov.uk', 'europa.eu', 'bund.de', 'belgium.be',
+}
+
+
+def registrable_domain(url: str) -> str:
+    """
+    Return the domain an organisation registered, e.g. ``tno.nl`` for ``https://careers.tno.nl/``.
+
+    Uses a small built-in list of multi-part suffixes (``co.uk``, ``com.au``, ...)
+    rather than the full public suffix list. Returns an empty string for
+    missing URLs and IP addresses.
+    """
+    host = urlsplit(canonicalize_url(url)).hostname or ''
+    labels = [label for label in host.split('.') if label]
+    if len(labels) < 2 or all(label.isdigit() for label in labels):
+        return ''
+    size = 3 if '.'.join(labels[-2:]) in MULTI_PART_SUFFIXES and len(labels) > 2 else 2
+    return '.'.join(labels[-size:])
+
+
+def organisation_key(url: str) -> str:
+    """
+    Return the key under which records for the same organisation collide.
+
+    This is the canonical host without ``www.``, so institutions on their own
+    subdomains of a parent organisation (``mpi-inf.mpg.de``, ``is.mpg.de``)
+    stay apart. On shared hosts (LinkedIn, government portals, ...) the
+    canonical URL is used so distinct pages stay apart too. Returns an empty
+    string for missing URLs and IP addresses.
+    """
+    domain = registrable_domain(url)
+    if not domain:
+        return ''
+    if domain in SHARED_HOSTS:
+        return canonicalize_url(url)
+    return urlsplit(canonicalize_url(url)).netloc
+
+
+def site_key(url: str) -> str:
+    """
+    Return the registrable domain of ``url``, or its canonical URL on shared hosts.
+
+    Records with different organisation keys but the same site key (``tno.nl``
+    and ``careers.tno.nl``) may describe one organisation; callers only merge
+    them when the names match as well.
+    """
+    domain = registrable_domain(url)
+    if domain in SHARED_HOSTS:
+        return canonicalize_url(url)
+    return domain
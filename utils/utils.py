@@ -4,25 +4,142 @@ Utility functions for file operations and data processing
 """
 
 import re
+import os
+import ast
+import glob
+import json as strict_json
 import json5 as json
 import pandas as pd
-from typing import List
+from pydantic import ValidationError
+from datetime import datetime
+from typing import Any, Callable, List, Dict, Optional, Tuple
 from models.data_models import Institution
+from .matching import NameClusters
+
+# Characters that matter when scanning for JSON: brackets, string quotes and escapes
+_JSON_TOKEN = re.compile(r'[\[\]{}"\\]')
+_MATCHING_OPENER = {']': '[', '}': '{'}
+
+def _scan_json_spans(text: str, begin: int, openers: str) -> Tuple[List[Tuple[int, int]], Optional[int]]:
+    """
+    One pass of ``locate_json_spans`` from ``begin``. Also returns the position
+    of the first unmatched opener if the text ended inside a string, else None.
+    """
+    spans = []
+    stack = []
+    in_string = False
+    escaped_at = -1
+
+    for match in _JSON_TOKEN.finditer(text, begin):
+        char, pos = match.group(), match.start()
+        if in_string:
+            if pos == escaped_at:
+                continue
+            if char == '\\':
+                escaped_at = pos + 1
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = bool(stack)
+        elif char in '[{':
+            stack.append((char, pos))
+        elif char in ']}':
+            opener = _MATCHING_OPENER[char]
+            for i in range(len(stack) - 1, -1, -1):
+                if stack[i][0] == opener:
+                    start = stack[i][1]
+                    del stack[i:]
+                    if opener in openers:
+                        spans.append((start, pos + 1))
+                    break
+
+    return spans, (stack[0][1] if stack and in_string else None)
+
+def locate_json_spans(text: str, openers: str = "[{") -> List[Tuple[int, int]]:
+    """
+    Find every balanced ``[...]`` / ``{...}`` span, normally in a single pass.
+
+    Brackets inside double-quoted strings are ignored and unmatched brackets
+    in surrounding prose are skipped. A quote in prose after an unmatched
+    bracket (``[note: the "best``) would hide the rest of the text inside a
+    string, so when the text ends inside a string it is scanned once more
+    from after the first unmatched bracket, with the string state reset.
+    Returns ``(start, end)`` pairs sorted by start, so enclosing spans come
+    before the spans nested in them.
+    """
+    spans, unmatched = _scan_json_spans(text, 0, openers)
+    if unmatched is not None:
+        # Spans after the unmatched bracket may have been read with the wrong string state.
+        # One rescan is enough for a stray quote; more would make odd-quoted text quadratic
+        spans = [span for span in spans if span[0] < unmatched]
+        spans.extend(_scan_json_spans(text, unmatched + 1, openers)[0])
+
+    spans.sort()
+    return spans
+
+def _lenient_loads(fragment: str):
+    """
+    Parse near-JSON: Python-style literals (single quotes, trailing commas,
+    True/None) go through the C-backed ``ast.literal_eval``; anything else
+    falls back to the slow but thorough ``json5`` parser.
+    """
+    try:
+        return ast.literal_eval(fragment)
+    except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+        return json.loads(fragment)
+
+def _find_in_value(value, openers: str, predicate: Optional[Callable[[Any], bool]]):
+    """Depth-first search of an already parsed value for the first array/object accepted by predicate."""
+    kind = '[' if isinstance(value, list) else '{' if isinstance(value, dict) else None
+    if kind is None:
+        return None
+    if kind in openers and (predicate is None or predicate(value)):
+        return value
+    for child in (value.values() if kind == '{' else value):
+        found = _find_in_value(child, openers, predicate)
+        if found is not None:
+            return found
+    return None
+
+def find_json(text: str, openers: str = "[{", predicate: Optional[Callable[[Any], bool]] = None):
+    """
+    Return the first JSON array/object in ``text`` that parses (and satisfies
+    ``predicate`` if given), or None if there is none.
+
+    Every candidate is tried with the fast strict ``json`` parser first; the
+    lenient parsers only run on candidates strict parsing rejected.
+    Spans nested inside a successfully parsed value are searched in the parsed
+    value instead of being parsed again.
+    """
+    spans = locate_json_spans(text, openers)
+    for parse in (strict_json.loads, _lenient_loads):
+        rejected = []
+        covered_until = -1
+        for start, end in spans:
+            if start < covered_until:
+                continue
+            try:
+                value = parse(text[start:end])
+            except ValueError:
+                rejected.append((start, end))
+                continue
+            found = _find_in_value(value, openers, predicate)
+            if found is not None:
+                return found
+            covered_until = end
+        spans = rejected
+    return None
 
 def extract_json_block(text: str) -> str:
     """Extract JSON code block from text."""
-    # Try multiple patterns to find JSON
-    patterns = [
-        r"```(?:json)?\s*(\[.*?\])\s*```",  # JSON array in code block
-        r"```(?:json)?\s*(\{.*?\})\s*```",  # JSON object in code block
-        r'(\[.*?\])',  # JSON array without code block
-        r'(\{.*?\})'   # JSON object without code block
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text, re.DOTALL)
-        if match:
-            return match.group(1)
+    spans = locate_json_spans(text)
+    for parse in (strict_json.loads, _lenient_loads):
+        for start, end in spans:
+            try:
+                parse(text[start:end])
+            except ValueError:
+                continue
+            return text[start:end]
     
     raise ValueError("No valid JSON block found in the output.")
 
@@ -37,14 +154,87 @@ def save_institutions_to_csv(institutions: List[Institution], filename: str = No
     return filename
 
 def load_institutions_from_csv(filename: str) -> List[Institution]:
-    """Load institutions from CSV file."""
+    """
+    Load institutions from CSV file.
+
+    Empty optional fields load as None and empty required ones (a missing
+    careers URL) as empty strings, as the workflow writes them. Rows that
+    still do not validate are reported and skipped.
+    """
     try:
-        df = pd.read_csv(filename)
-        return [Institution(**row.to_dict()) for _, row in df.iterrows()]
+        df = pd.read_csv(filename, dtype=str, keep_default_na=False)
     except Exception as e:
         print(f"Error loading from CSV: {e}")
         return []
 
+    fields = Institution.model_fields
+    institutions = []
+    for index, row in df.iterrows():
+        values = {key: (value or (None if key in fields and not fields[key].is_required() else value))
+                  for key, value in row.to_dict().items()}
+        try:
+            institutions.append(Institution(**values))
+        except ValidationError as e:
+            print(f"⚠️ Skipping row {index + 2} of {filename}: {e.error_count()} invalid fields")
+    return institutions
+
+def latest_results_csv(directory: str = ".") -> Optional[str]:
+    """Return the most recent institutions_<timestamp>.csv written by the workflow, if any."""
+    candidates = sorted(
+        path for path in glob.glob(os.path.join(directory, "institutions_*.csv"))
+        if not path.endswith("_partial.csv")
+    )
+    return candidates[-1] if candidates else None
+
+class PreviousResults:
+    """
+    Records of a previous run, looked up by discovered name.
+
+    The detail crew stores the institution's exact name, which often differs
+    from the name discovery found ("Delft University of Technology" for
+    "TU Delft"), so names are matched the way discovery clusters variants
+    (``NameClusters``) rather than by exact string.
+    """
+
+    def __init__(self, institutions: List[Institution], threshold: float = 0.9):
+        self._clusters = NameClusters(threshold=threshold)
+        self._records: Dict[str, Institution] = {}
+        for inst in institutions:
+            kept = self._clusters.add(inst.name)
+            if kept is not None:
+                self._records.setdefault(kept, inst)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def get(self, name: str) -> Optional[Institution]:
+        """Return the previous record of the institution ``name`` refers to, or None."""
+        kept = self._clusters.match(name)
+        return self._records.get(kept) if kept is not None else None
+
+
+def load_institution_store(filename: str, threshold: float = 0.9) -> PreviousResults:
+    """
+    Load previous results for lookup by discovered name (see ``PreviousResults``).
+
+    Records written before ``last_updated`` existed are stamped with the
+    file's modification time so they can still be aged out.
+    """
+    file_timestamp = datetime.fromtimestamp(os.path.getmtime(filename)).isoformat(timespec="seconds")
+    institutions = load_institutions_from_csv(filename)
+    for inst in institutions:
+        if not inst.last_updated:
+            inst.last_updated = file_timestamp
+    return PreviousResults(institutions, threshold)
+
+def is_stale(inst: Institution, max_age_days: float) -> bool:
+    """Return True if a record was last researched more than ``max_age_days`` ago."""
+    try:
+        updated = datetime.fromisoformat(inst.last_updated)
+    except (TypeError, ValueError):
+        return True
+    return (datetime.now() - updated).total_seconds() > max_age_days * 86400
+
 def print_research_summary(institutions: List[Institution]):
     """Print a summary of research results."""
     print(f"\nResearch Summary:")